@@ -1,11 +1,16 @@
 # db/category_handler.py
 
-from neo4j import Driver
-from typing import Optional
+from neo4j import AsyncDriver, AsyncSession, AsyncTransaction
+from typing import List, Optional
 from pydantic import BaseModel
 from taxonomy_synthesis.models import Category as TSCategory
+import logging
 import uuid
 
+from db.transactions import use_session
+
+logger = logging.getLogger(__name__)
+
 
 class Position(BaseModel):
     x: int
@@ -16,31 +21,116 @@ class CategoryModel(TSCategory):
     id: str
 
 
-def create_category(
-    driver: Driver,
+class NewCategory(TSCategory):
+    position: Position
+    is_child_of: Optional[str] = None  # CATEGORY ID
+    is_parent_of: Optional[str] = None  # CATEGORY ID
+
+
+# Maximum number of categories written per transaction by create_categories
+CATEGORY_BATCH_SIZE = 1000
+
+
+# Cypher statements are module constants so every call sends the same query
+# text and hits the server's query plan cache. Categories carry their
+# `session_id` so ownership checks are a property filter on the indexed id
+# lookup rather than a hop from the SESSION node. Every write bumps
+# `SESSION.version`, which invalidates cached session data.
+_CREATE_CATEGORY_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+CREATE (c:CATEGORY {id: $id, session_id: $session_id, name: $name, description: $description, x: $x, y: $y})
+CREATE (s)-[:HAS]->(c)
+WITH c
+OPTIONAL MATCH (parent:CATEGORY {id: $is_child_of})
+FOREACH (p IN CASE WHEN parent IS NULL THEN [] ELSE [parent] END |
+    CREATE (c)-[:IS_CHILD_OF]->(p)
+    CREATE (p)-[:IS_PARENT_TO]->(c)
+)
+WITH c
+OPTIONAL MATCH (child:CATEGORY {id: $is_parent_of})
+FOREACH (ch IN CASE WHEN child IS NULL THEN [] ELSE [child] END |
+    CREATE (c)-[:IS_PARENT_TO]->(ch)
+    CREATE (ch)-[:IS_CHILD_OF]->(c)
+)
+"""
+
+_CREATE_CATEGORIES_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+WITH s
+UNWIND $rows AS row
+CREATE (c:CATEGORY {id: row.id, session_id: $session_id, name: row.name, description: row.description, x: row.x, y: row.y})
+CREATE (s)-[:HAS]->(c)
+"""
+
+_CREATE_CATEGORY_RELATIONSHIPS_CYPHER = """
+UNWIND $rows AS row
+MATCH (c:CATEGORY {id: row.id})
+OPTIONAL MATCH (parent:CATEGORY {id: row.is_child_of})
+OPTIONAL MATCH (child:CATEGORY {id: row.is_parent_of})
+FOREACH (p IN CASE WHEN parent IS NULL THEN [] ELSE [parent] END |
+    CREATE (c)-[:IS_CHILD_OF]->(p)
+    CREATE (p)-[:IS_PARENT_TO]->(c)
+)
+FOREACH (ch IN CASE WHEN child IS NULL THEN [] ELSE [child] END |
+    CREATE (c)-[:IS_PARENT_TO]->(ch)
+    CREATE (ch)-[:IS_CHILD_OF]->(c)
+)
+"""
+
+_DELETE_CATEGORY_CYPHER = """
+MATCH (c:CATEGORY {id: $category_id})
+WHERE c.session_id = $session_id
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+DETACH DELETE c
+"""
+
+_UPDATE_CATEGORY_CYPHER = """
+MATCH (c:CATEGORY {id: $category_id})
+WHERE c.session_id = $session_id
+MATCH (s:SESSION {id: $session_id})
+SET c += $updates
+SET s.version = coalesce(s.version, 0) + 1
+RETURN c.id AS id, c.name AS name, c.description AS description
+"""
+
+
+async def create_category(
+    driver: AsyncDriver,
     name: str,
     description: str,
     position: Position,
     session_id: str,
     is_child_of: Optional[str] = None,
     is_parent_of: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
+    tx: Optional[AsyncTransaction] = None,
 ) -> CategoryModel:
-    category_id = str(uuid.uuid4())
-    with driver.session() as session:
-        session.execute_write(
-            _create_category_tx,
-            category_id,
-            name,
-            description,
-            position,
-            session_id,
-            is_child_of,
-            is_parent_of,
-        )
-    return CategoryModel(id=category_id, name=name, description=description)
+    category_id = uuid.uuid4().hex
+    args = (
+        category_id,
+        name,
+        description,
+        position,
+        session_id,
+        is_child_of,
+        is_parent_of,
+    )
+    if tx is not None:
+        # Part of the caller's transaction function (e.g.
+        # `_create_session_with_root_tx`), which the driver retries as a whole
+        await _create_category_tx(tx, *args)
+    else:
+        async with use_session(driver, session) as db_session:
+            await db_session.execute_write(_create_category_tx, *args)
+    return CategoryModel.model_construct(
+        id=category_id, name=name, description=description
+    )
 
 
-def _create_category_tx(
+async def _create_category_tx(
     tx,
     category_id: str,
     name: str,
@@ -50,64 +140,118 @@ def _create_category_tx(
     is_child_of: Optional[str],
     is_parent_of: Optional[str],
 ):
-    # Create the CATEGORY node
-    tx.run(
-        """
-        MATCH (s:SESSION {id: $session_id})
-        CREATE (c:CATEGORY {id: $id, name: $name, description: $description, x: $x, y: $y})
-        CREATE (s)-[:HAS]->(c)
-        """,
-        id=category_id,
-        name=name,
-        description=description,
-        x=position.x,
-        y=position.y,
-        session_id=session_id,
-    )
-
-    # Create IS_CHILD_OF and IS_PARENT_TO relationships if provided
-    if is_child_of:
-        tx.run(
-            """
-            MATCH (parent:CATEGORY {id: $parent_id}), (child:CATEGORY {id: $child_id})
-            CREATE (child)-[:IS_CHILD_OF]->(parent)
-            CREATE (parent)-[:IS_PARENT_TO]->(child)
-            """,
-            parent_id=is_child_of,
-            child_id=category_id,
+    # Create the CATEGORY node together with its optional IS_CHILD_OF /
+    # IS_PARENT_TO relationships in a single round-trip
+    await (
+        await tx.run(
+            _CREATE_CATEGORY_CYPHER,
+            id=category_id,
+            name=name,
+            description=description,
+            x=position.x,
+            y=position.y,
+            session_id=session_id,
+            is_child_of=is_child_of,
+            is_parent_of=is_parent_of,
         )
+    ).consume()
+
+
+async def create_categories(
+    driver: AsyncDriver,
+    session_id: str,
+    categories: List[NewCategory],
+    session: Optional[AsyncSession] = None,
+) -> List[CategoryModel]:
+    """
+    Creates many categories within a session using batched UNWIND queries.
 
-    if is_parent_of:
-        tx.run(
-            """
-            MATCH (parent:CATEGORY {id: $parent_id}), (child:CATEGORY {id: $child_id})
-            CREATE (parent)-[:IS_PARENT_TO]->(child)
-            CREATE (child)-[:IS_CHILD_OF]->(parent)
-            """,
-            parent_id=category_id,
-            child_id=is_parent_of,
+    Categories are written in transactions of at most `CATEGORY_BATCH_SIZE`
+    rows, so a large taxonomy import costs one commit per batch instead of
+    one session and commit per category.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        session_id (str): ID of the session.
+        categories (List[NewCategory]): Categories to be created.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
+
+    Returns:
+        List[CategoryModel]: The created categories, in input order.
+    """
+    rows = [
+        {
+            "id": uuid.uuid4().hex,
+            "name": category.name,
+            "description": category.description,
+            "x": category.position.x,
+            "y": category.position.y,
+            "is_child_of": category.is_child_of,
+            "is_parent_of": category.is_parent_of,
+        }
+        for category in categories
+    ]
+    async with use_session(driver, session) as db_session:
+        for start in range(0, len(rows), CATEGORY_BATCH_SIZE):
+            await db_session.execute_write(
+                _create_categories_tx,
+                session_id,
+                rows[start : start + CATEGORY_BATCH_SIZE],
+            )
+    return [
+        CategoryModel.model_construct(
+            id=row["id"], name=row["name"], description=row["description"]
         )
+        for row in rows
+    ]
 
 
-def delete_category(driver: Driver, session_id: str, category_id: str) -> None:
-    with driver.session() as session:
-        session.execute_write(_delete_category_tx, session_id, category_id)
+async def _create_categories_tx(tx, session_id: str, rows: List[dict]):
+    # Create all CATEGORY nodes of the batch
+    await (
+        await tx.run(
+            _CREATE_CATEGORIES_CYPHER,
+            session_id=session_id,
+            rows=rows,
+        )
+    ).consume()
+
+    # Create IS_CHILD_OF and IS_PARENT_TO relationships for the rows that have them
+    relationship_rows = [
+        row for row in rows if row["is_child_of"] or row["is_parent_of"]
+    ]
+    if relationship_rows:
+        await (
+            await tx.run(
+                _CREATE_CATEGORY_RELATIONSHIPS_CYPHER,
+                rows=relationship_rows,
+            )
+        ).consume()
+
+
+async def delete_category(
+    driver: AsyncDriver,
+    session_id: str,
+    category_id: str,
+    session: Optional[AsyncSession] = None,
+) -> None:
+    async with use_session(driver, session) as db_session:
+        await db_session.execute_write(_delete_category_tx, session_id, category_id)
 
 
-def _delete_category_tx(tx, session_id: str, category_id: str):
+async def _delete_category_tx(tx, session_id: str, category_id: str):
     # Ensure the category is associated with the session
-    tx.run(
-        """
-        MATCH (s:SESSION {id: $session_id})-[:HAS]->(c:CATEGORY {id: $category_id})
-        DETACH DELETE c
-        """,
-        session_id=session_id,
-        category_id=category_id,
-    )
+    await (
+        await tx.run(
+            _DELETE_CATEGORY_CYPHER,
+            session_id=session_id,
+            category_id=category_id,
+        )
+    ).consume()
 
 
-def update_category(
-    driver: Driver,
+async def update_category(
+    driver: AsyncDriver,
     session_id: str,
     category_id: str,
     name: Optional[str] = None,
@@ -115,12 +259,13 @@ def update_category(
     position: Optional[Position] = None,
     is_child_of: Optional[str] = None,
     is_parent_of: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
 ) -> CategoryModel:
     """
     Updates an existing category within a session.
 
     Args:
-        driver (Driver): Neo4j driver instance.
+        driver (AsyncDriver): Neo4j driver instance.
         session_id (str): ID of the session.
         category_id (str): ID of the category to update.
         name (Optional[str]): New name for the category.
@@ -128,13 +273,13 @@ def update_category(
         position (Optional[Position]): New position for the category.
         is_child_of (Optional[str]): ID of the new parent category.
         is_parent_of (Optional[str]): ID of the new child category.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
 
     Returns:
         CategoryModel: The updated category.
     """
-    with driver.session() as session:
-        print("category position", position)
-        updated_category = session.execute_write(
+    async with use_session(driver, session) as db_session:
+        updated_category = await db_session.execute_write(
             _update_category_tx,
             session_id,
             category_id,
@@ -147,7 +292,7 @@ def update_category(
     return updated_category
 
 
-def _update_category_tx(
+async def _update_category_tx(
     tx,
     session_id: str,
     category_id: str,
@@ -175,47 +320,36 @@ def _update_category_tx(
     Raises:
         ValueError: If the category does not exist within the session.
     """
-    # Check if the category exists within the session
-    check_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(c:CATEGORY {id: $category_id})
-    RETURN c
-    """
-    result = tx.run(
-        check_query,
-        session_id=session_id,
-        category_id=category_id,
+    # Collect the properties to update, if provided. They are applied with
+    # `SET c += $updates`, so the query text is the same for every combination
+    update_fields = {
+        key: value
+        for key, value in (
+            ("name", name),
+            ("description", description),
+            ("x", position.x if position else None),
+            ("y", position.y if position else None),
+        )
+        if value is not None
+    }
+
+    # Update the category and return it in one round-trip; no row means the
+    # category does not exist within the session
+    updated_result = await (
+        await tx.run(
+            _UPDATE_CATEGORY_CYPHER,
+            session_id=session_id,
+            category_id=category_id,
+            updates=update_fields,
+        )
     ).single()
 
-    if not result:
+    if not updated_result:
         raise ValueError(
             f"Category with id '{category_id}' not found in session '{session_id}'."
         )
-
-    # Update the category's properties if provided
-    if name or description or position:
-        update_fields = {}
-        if name:
-            update_fields["name"] = name
-        if description:
-            update_fields["description"] = description
-        if position:
-            update_fields["x"] = position.x
-            update_fields["y"] = position.y
-
-        # Dynamically build the SET clause based on provided fields
-        set_clauses = ", ".join([f"c.{key} = ${key}" for key in update_fields.keys()])
-        update_query = f"""
-        MATCH (s:SESSION {{id: $session_id}})-[:HAS]->(c:CATEGORY {{id: $category_id}})
-        SET {set_clauses}
-        """
-
-        tx.run(
-            update_query,
-            session_id=session_id,
-            category_id=category_id,
-            **update_fields,
-        )
-        print(f"Category Updated: {category_id}")
+    if update_fields:
+        logger.debug("Category Updated: %s", category_id)
 
     # # Update IS_CHILD_OF relationship if provided
     # if is_child_of:
@@ -327,24 +461,8 @@ def _update_category_tx(
     #         f"IS_PARENT_TO relationship removed: {category_id} is no longer parent of any category"
     #     )
 
-    # Fetch the updated category to return
-    get_category_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(c:CATEGORY {id: $category_id})
-    RETURN c.id AS id, c.name AS name, c.description AS description
-    """
-    updated_result = tx.run(
-        get_category_query,
-        session_id=session_id,
-        category_id=category_id,
-    ).single()
-
-    if updated_result:
-        return CategoryModel(
-            id=updated_result["id"],
-            name=updated_result["name"],
-            description=updated_result["description"],
-        )
-    else:
-        raise ValueError(
-            f"Failed to update category with id '{category_id}' in session '{session_id}'."
-        )
+    return CategoryModel.model_construct(
+        id=updated_result["id"],
+        name=updated_result["name"],
+        description=updated_result["description"],
+    )
@@ -1,50 +1,184 @@
 # db/item_handler.py
 
-from neo4j import Driver
-from typing import Optional, List
+from neo4j import AsyncDriver, AsyncSession
+from typing import Dict, Optional, List
+import logging
 import uuid
-import json
 
+from db.transactions import use_session
 from taxonomy_synthesis.models import Item as TSItem  # Imported TSItem
 
+logger = logging.getLogger(__name__)
+
 
 class ItemModel(TSItem):
     id_: str  # Unique across the database
     properties: str  # JSON string of the properties
 
 
+def serialize_properties(item: TSItem) -> str:
+    """
+    Serializes the arbitrary fields of an item (all but `id` and `id_`) to JSON.
+
+    The result is stored as a single string property on the ITEM node, since
+    Neo4j node properties cannot hold the nested maps and lists items may carry.
+
+    Args:
+        item (TSItem): Item whose properties are serialized.
+
+    Returns:
+        str: JSON string of the properties.
+    """
+    # Serialize straight to JSON in pydantic-core, without building the
+    # intermediate dict that `model_dump` returns
+    return item.model_dump_json(exclude={"id", "id_"})
+
+
+# Maximum number of items written per transaction by create_items_bulk
+ITEM_BATCH_SIZE = 1000
+
+
+# Cypher statements are module constants so every call sends the same query
+# text and hits the server's query plan cache. Every write bumps
+# `SESSION.version`, which invalidates cached session data. Items carry their
+# `session_id`, so they are looked up (and merged) through the composite
+# (session_id, id) constraint instead of a hop from the SESSION node.
+_UPSERT_ITEM_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+MERGE (i:ITEM {session_id: $session_id, id: $id})
+ON CREATE SET i.id_ = $id_
+MERGE (s)-[:HAS]->(i)
+SET i.properties = $properties
+SET s.version = coalesce(s.version, 0) + 1
+WITH i
+OPTIONAL MATCH (old:CATEGORY)-[r:CONTAINS]->(i)
+WHERE $category_id IS NULL OR old.id <> $category_id
+DELETE r
+WITH DISTINCT i
+OPTIONAL MATCH (c:CATEGORY {id: $category_id})
+FOREACH (x IN CASE WHEN c IS NULL THEN [] ELSE [c] END | MERGE (x)-[:CONTAINS]->(i))
+RETURN i.id_ AS id_
+"""
+
+_UPDATE_ITEM_CYPHER = """
+MATCH (i:ITEM {session_id: $session_id, id: $id})
+MATCH (s:SESSION {id: $session_id})
+SET i.properties = $properties
+SET s.version = coalesce(s.version, 0) + 1
+WITH i
+OPTIONAL MATCH (old:CATEGORY)-[r:CONTAINS]->(i)
+WHERE $category_id IS NULL OR old.id <> $category_id
+DELETE r
+WITH DISTINCT i
+OPTIONAL MATCH (c:CATEGORY {id: $category_id})
+FOREACH (x IN CASE WHEN c IS NULL THEN [] ELSE [c] END | MERGE (x)-[:CONTAINS]->(i))
+RETURN i.id_ AS id_
+"""
+
+_DELETE_ITEMS_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+WITH s
+UNWIND $item_ids AS item_id
+MATCH (i:ITEM {session_id: $session_id, id: item_id})
+DETACH DELETE i
+"""
+
+_SET_CATEGORY_ITEMS_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+WITH s
+OPTIONAL MATCH (c:CATEGORY {id: $category_id})
+WHERE c.session_id = $session_id
+CALL {
+    WITH c
+    MATCH (c)-[:CONTAINS]->(x:ITEM)
+    WHERE NOT x.id IN $item_ids
+    DETACH DELETE x
+}
+WITH s, c
+UNWIND $rows AS row
+MERGE (i:ITEM {session_id: $session_id, id: row.id})
+ON CREATE SET i.id_ = row.id_
+MERGE (s)-[:HAS]->(i)
+SET i.properties = row.properties
+WITH c, i
+OPTIONAL MATCH (old:CATEGORY)-[r:CONTAINS]->(i)
+WHERE c IS NULL OR old <> c
+DELETE r
+WITH DISTINCT c, i
+FOREACH (x IN CASE WHEN c IS NULL THEN [] ELSE [c] END | MERGE (x)-[:CONTAINS]->(i))
+RETURN i.id AS id, i.id_ AS id_
+"""
+
+_MERGE_ITEMS_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+WITH s
+UNWIND $rows AS row
+MERGE (i:ITEM {session_id: $session_id, id: row.id})
+ON CREATE SET i.id_ = row.id_
+MERGE (s)-[:HAS]->(i)
+SET i.properties = row.properties
+RETURN i.id AS id, i.id_ AS id_
+"""
+
+_UPDATE_ITEMS_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+SET s.version = coalesce(s.version, 0) + 1
+WITH s
+UNWIND $rows AS row
+MATCH (i:ITEM {session_id: $session_id, id: row.id})
+SET i.properties = row.properties
+RETURN i.id AS id, i.id_ AS id_
+"""
+
+_SET_ITEMS_CONTAINER_CYPHER = """
+UNWIND $rows AS row
+MATCH (i:ITEM {id_: row.id_})
+OPTIONAL MATCH (old:CATEGORY)-[r:CONTAINS]->(i)
+WHERE row.container IS NULL OR old.id <> row.container
+DELETE r
+WITH DISTINCT i, row
+MATCH (c:CATEGORY {id: row.container})
+MERGE (c)-[:CONTAINS]->(i)
+"""
+
+
 # Create Item Function
-def create_item(
-    driver: Driver,
+async def create_item(
+    driver: AsyncDriver,
     session_id: str,
     item: TSItem,
     is_contained_inside: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
 ) -> ItemModel:
     """
     Creates a new item within the specified session.
 
     Args:
-        driver (Driver): Neo4j driver instance.
+        driver (AsyncDriver): Neo4j driver instance.
         session_id (str): ID of the session.
         item (TSItem): Item data to be created.
         is_contained_inside (Optional[str]): CATEGORY ID for the CONTAINS relationship.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
 
     Returns:
         ItemModel: The created item with a unique `id_`.
     """
-    with driver.session() as session:
-        res = session.execute_write(
+    async with use_session(driver, session) as db_session:
+        res = await db_session.execute_write(
             _create_item_tx, session_id, item, is_contained_inside
         )
 
     return res
 
 
-def _create_item_tx(
+async def _create_item_tx(
     tx, session_id: str, item: TSItem, is_contained_inside: Optional[str]
 ) -> ItemModel:
     """
-    Transaction function to create an item and establish relationships.
+    Transaction function to create (or update) an item and establish relationships.
 
     Args:
         tx: Neo4j transaction object.
@@ -55,89 +189,141 @@ def _create_item_tx(
     Returns:
         ItemModel: The created item with a unique `id_`.
     """
-    # Check if the item already exists
-    find_item_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM {id: $id})
-    RETURN i
-    """
-    result = tx.run(
-        find_item_query,
-        session_id=session_id,
-        id=item.id,
+    # Generate a unique id_ (UUID hex) for the item, kept only if it is new
+    id_ = uuid.uuid4().hex
+
+    # Serialize properties excluding 'id' and 'id_'
+    properties_json = serialize_properties(item)
+
+    # Upsert the ITEM node under the SESSION and move it into
+    # is_contained_inside (or out of any category). MERGE keeps this
+    # idempotent, so a retried transaction cannot duplicate the item, and an
+    # existing item keeps its id_
+    record = await (
+        await tx.run(
+            _UPSERT_ITEM_CYPHER,
+            session_id=session_id,
+            id=item.id,
+            id_=id_,
+            properties=properties_json,
+            category_id=is_contained_inside,
+        )
     ).single()
+    if record:
+        id_ = record["id_"]
+
+    # Create an ItemModel instance by adding id_ to the TSItem
+    item_model = ItemModel.model_construct(
+        id_=id_, id=item.id, properties=properties_json
+    )
+    logger.debug("Item Created or Updated: %s", item.id)
 
-    if result:
-        # Item exists; update it instead
-        return _update_item_tx(tx, session_id, item, is_contained_inside)
+    return item_model
 
-    # Generate a unique id_ (UUID) for the item
-    id_ = str(uuid.uuid4())
 
-    # Extract properties excluding 'id' and 'id_'
-    properties = item.model_dump(exclude={"id", "id_"})
-    properties_json = json.dumps(properties)
+async def create_items_bulk(
+    driver: AsyncDriver,
+    session_id: str,
+    items: List[TSItem],
+    container_map: Optional[Dict[str, str]] = None,
+    session: Optional[AsyncSession] = None,
+) -> List[ItemModel]:
+    """
+    Creates (or updates, like `create_item`) many items within the specified session.
 
-    # Create an ItemModel instance by adding id_ to the TSItem
-    item_model = ItemModel(id_=id_, id=item.id, properties=properties_json)
+    Items are written with batched UNWIND queries in transactions of at most
+    `ITEM_BATCH_SIZE` items, instead of one session and transaction per item.
 
-    # Create ITEM node and establish HAS relationship with SESSION
-    create_item_query = """
-    MATCH (s:SESSION {id: $session_id})
-    CREATE (i:ITEM {id: $id, id_: $id_, properties: $properties})
-    CREATE (s)-[:HAS]->(i)
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        session_id (str): ID of the session.
+        items (List[TSItem]): Items to be created.
+        container_map (Optional[Dict[str, str]]): CATEGORY ID for the CONTAINS
+            relationship of each item, keyed by item `id`. Items missing from the
+            map end up outside of any category.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
+
+    Returns:
+        List[ItemModel]: The created or updated items, in input order.
     """
-    tx.run(
-        create_item_query,
-        session_id=session_id,
-        id=item_model.id,
-        id_=item_model.id_,
-        properties=item_model.properties,
-    )
-    print(f"Item Created: {item.id}")
-
-    # If is_contained_inside is provided, create CONTAINS relationship with CATEGORY
-    if is_contained_inside:
-        create_contains_query = """
-        MATCH (c:CATEGORY {id: $category_id}), (i:ITEM {id_: $id_})
-        CREATE (c)-[:CONTAINS]->(i)
-        """
-        tx.run(
-            create_contains_query,
-            category_id=is_contained_inside,
-            id_=item_model.id_,
+    container_map = container_map or {}
+    rows = [
+        {
+            "id": item.id,
+            "id_": uuid.uuid4().hex,
+            "properties": serialize_properties(item),
+            "container": container_map.get(item.id),
+        }
+        for item in items
+    ]
+    async with use_session(driver, session) as db_session:
+        for start in range(0, len(rows), ITEM_BATCH_SIZE):
+            await db_session.execute_write(
+                _create_items_bulk_tx,
+                session_id,
+                rows[start : start + ITEM_BATCH_SIZE],
+            )
+
+    return [
+        ItemModel.model_construct(
+            id_=row["id_"], id=row["id"], properties=row["properties"]
         )
+        for row in rows
+    ]
 
-    return item_model
+
+async def _create_items_bulk_tx(tx, session_id: str, rows: List[dict]) -> None:
+    """
+    Transaction function to upsert a batch of items and their CONTAINS relationships.
+
+    Args:
+        tx: Neo4j transaction object.
+        session_id (str): ID of the session.
+        rows (List[dict]): Item rows with `id`, `id_`, `properties` and `container`.
+
+    Returns:
+        None
+    """
+    # Upsert the ITEM nodes; existing items keep their id_
+    result = await tx.run(_MERGE_ITEMS_CYPHER, session_id=session_id, rows=rows)
+    stored_ids = {record["id"]: record["id_"] async for record in result}
+    for row in rows:
+        row["id_"] = stored_ids.get(row["id"], row["id_"])
+
+    # Move every item into its container (or out of any category)
+    await (await tx.run(_SET_ITEMS_CONTAINER_CYPHER, rows=rows)).consume()
 
 
 # Update Item Function
-def update_item(
-    driver: Driver,
+async def update_item(
+    driver: AsyncDriver,
     session_id: str,
     item: TSItem,
     is_contained_inside: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
 ) -> ItemModel:
     """
     Updates an existing item within the specified session. If the item does not exist, it will be created.
 
     Args:
-        driver (Driver): Neo4j driver instance.
+        driver (AsyncDriver): Neo4j driver instance.
         session_id (str): ID of the session.
         item (TSItem): Item data to be updated.
         is_contained_inside (Optional[str]): CATEGORY ID for the CONTAINS relationship.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
 
     Returns:
         ItemModel: The updated or newly created item with a unique `id_`.
     """
-    with driver.session() as session:
-        res = session.execute_write(
+    async with use_session(driver, session) as db_session:
+        res = await db_session.execute_write(
             _update_item_tx, session_id, item, is_contained_inside
         )
 
     return res
 
 
-def _update_item_tx(
+async def _update_item_tx(
     tx, session_id: str, item: TSItem, is_contained_inside: Optional[str]
 ) -> ItemModel:
     """
@@ -152,16 +338,18 @@ def _update_item_tx(
     Returns:
         ItemModel: The updated item with a unique `id_`.
     """
-    # Attempt to find the item by 'id' within the session
-    find_item_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM {id: $id})
-    OPTIONAL MATCH (c:CATEGORY)-[:CONTAINS]->(i)
-    RETURN i.id_ AS id_, i.properties AS properties, c.id AS current_category
-    """
-    result = tx.run(
-        find_item_query,
-        session_id=session_id,
-        id=item.id,
+    new_properties_json = serialize_properties(item)
+
+    # Update the ITEM properties and move it into `is_contained_inside` (or out
+    # of any category) in one round-trip; no row means the item does not exist
+    result = await (
+        await tx.run(
+            _UPDATE_ITEM_CYPHER,
+            session_id=session_id,
+            id=item.id,
+            properties=new_properties_json,
+            category_id=is_contained_inside,
+        )
     ).single()
 
     # raise error
@@ -169,58 +357,11 @@ def _update_item_tx(
         raise ValueError(
             f"Item with id '{item.id}' not found in session '{session_id}'."
         )
-
-    # Item exists; proceed to update
     id_ = result["id_"]
-    id = item.id
-    current_category = result["current_category"]
-
-    # Serialize new properties
-    new_properties = item.model_dump(exclude={"id", "id_"})
-    new_properties_json = json.dumps(new_properties)
-
-    # Update ITEM properties
-    update_properties_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM {id: $id})
-    SET i.properties = $properties
-    """
-    tx.run(
-        update_properties_query,
-        session_id=session_id,
-        id=id,
-        properties=new_properties_json,
-    )
-    print(f"Item Updated: {item.id}")
-
-    # Handle CONTAINS relationship
-    if is_contained_inside != current_category:
-        if current_category:
-            # Remove existing CONTAINS relationship
-            remove_contains_query = """
-            MATCH (c:CATEGORY)-[r:CONTAINS]->(i:ITEM {id_: $id_})
-            DELETE r
-            """
-            tx.run(
-                remove_contains_query,
-                id_=id_,
-            )
-            print(f"CONTAINS relationship removed from category: {current_category}")
-
-        if is_contained_inside:
-            # Create new CONTAINS relationship
-            create_contains_query = """
-            MATCH (c:CATEGORY {id: $category_id}), (i:ITEM {id_: $id_})
-            CREATE (c)-[:CONTAINS]->(i)
-            """
-            tx.run(
-                create_contains_query,
-                category_id=is_contained_inside,
-                id_=id_,
-            )
-            print(f"CONTAINS relationship created with category: {is_contained_inside}")
+    logger.debug("Item Updated: %s", item.id)
 
     # Return the updated ItemModel
-    updated_item = ItemModel(
+    updated_item = ItemModel.model_construct(
         id_=id_,
         id=item.id,
         properties=new_properties_json,
@@ -228,24 +369,109 @@ def _update_item_tx(
     return updated_item
 
 
+async def update_items_bulk(
+    driver: AsyncDriver,
+    session_id: str,
+    items: List[TSItem],
+    is_contained_inside: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
+) -> List[ItemModel]:
+    """
+    Updates many existing items within the specified session, like `update_item`.
+
+    Items are written with batched UNWIND queries in transactions of at most
+    `ITEM_BATCH_SIZE` items. Items that do not exist in the session are skipped.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        session_id (str): ID of the session.
+        items (List[TSItem]): Items to be updated.
+        is_contained_inside (Optional[str]): CATEGORY ID for the CONTAINS
+            relationship of every item; None moves them out of any category.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
+
+    Returns:
+        List[ItemModel]: The updated items, in input order.
+    """
+    rows = [
+        {
+            "id": item.id,
+            "properties": serialize_properties(item),
+            "container": is_contained_inside,
+        }
+        for item in items
+    ]
+    updated_rows = []
+    async with use_session(driver, session) as db_session:
+        for start in range(0, len(rows), ITEM_BATCH_SIZE):
+            updated_rows.extend(
+                await db_session.execute_write(
+                    _update_items_bulk_tx,
+                    session_id,
+                    rows[start : start + ITEM_BATCH_SIZE],
+                )
+            )
+
+    return [
+        ItemModel.model_construct(
+            id_=row["id_"], id=row["id"], properties=row["properties"]
+        )
+        for row in updated_rows
+    ]
+
+
+async def _update_items_bulk_tx(tx, session_id: str, rows: List[dict]) -> List[dict]:
+    """
+    Transaction function to update a batch of items and their CONTAINS relationships.
+
+    Args:
+        tx: Neo4j transaction object.
+        session_id (str): ID of the session.
+        rows (List[dict]): Item rows with `id`, `properties` and `container`.
+
+    Returns:
+        List[dict]: The rows of the items that exist, with their `id_` filled in.
+    """
+    # Update the properties of the existing ITEM nodes
+    result = await tx.run(_UPDATE_ITEMS_CYPHER, session_id=session_id, rows=rows)
+    stored_ids = {record["id"]: record["id_"] async for record in result}
+    updated_rows = []
+    for row in rows:
+        if row["id"] in stored_ids:
+            updated_rows.append({**row, "id_": stored_ids[row["id"]]})
+        else:
+            logger.info("Item not found: %s", row["id"])
+
+    # Move the updated items into their container (or out of any category)
+    if updated_rows:
+        await (await tx.run(_SET_ITEMS_CONTAINER_CYPHER, rows=updated_rows)).consume()
+    return updated_rows
+
+
 # Delete Item Function
-def delete_item(driver: Driver, session_id: str, item_ids: List[str]) -> None:
+async def delete_item(
+    driver: AsyncDriver,
+    session_id: str,
+    item_ids: List[str],
+    session: Optional[AsyncSession] = None,
+) -> None:
     """
     Deletes items within the specified session based on their IDs.
 
     Args:
-        driver (Driver): Neo4j driver instance.
+        driver (AsyncDriver): Neo4j driver instance.
         session_id (str): ID of the session.
         item_ids (List[str]): List of item IDs to be deleted.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
 
     Returns:
         None
     """
-    with driver.session() as session:
-        session.execute_write(_delete_item_tx, session_id, item_ids)
+    async with use_session(driver, session) as db_session:
+        await db_session.execute_write(_delete_item_tx, session_id, item_ids)
 
 
-def _delete_item_tx(tx, session_id: str, item_ids: List[str]) -> None:
+async def _delete_item_tx(tx, session_id: str, item_ids: List[str]) -> None:
     """
     Transaction function to delete items and their relationships.
 
@@ -257,20 +483,18 @@ def _delete_item_tx(tx, session_id: str, item_ids: List[str]) -> None:
     Returns:
         None
     """
-    delete_items_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM)
-    WHERE i.id IN $item_ids
-    DETACH DELETE i
-    """
-    tx.run(delete_items_query, session_id=session_id, item_ids=item_ids)
-    print(f"Items Deleted: {item_ids}")
+    await (
+        await tx.run(_DELETE_ITEMS_CYPHER, session_id=session_id, item_ids=item_ids)
+    ).consume()
+    logger.debug("Items Deleted: %s", item_ids)
 
 
-def update_category_items(
-    driver: Driver,
+async def update_category_items(
+    driver: AsyncDriver,
     session_id: str,
     category_id: str,
     items: List[TSItem],
+    session: Optional[AsyncSession] = None,
 ) -> List[ItemModel]:
     """
     Updates the items inside a category according to the following rules:
@@ -279,22 +503,23 @@ def update_category_items(
     - Items that exist both in the category and in the input list are updated.
 
     Args:
-        driver (Driver): Neo4j driver instance.
+        driver (AsyncDriver): Neo4j driver instance.
         session_id (str): ID of the session.
         category_id (str): ID of the category.
         items (List[TSItem]): List of items to update in the category.
+        session (Optional[AsyncSession]): Open session to reuse instead of opening one.
 
     Returns:
         List[ItemModel]: List of updated or created items.
     """
-    with driver.session() as session:
-        updated_items = session.execute_write(
+    async with use_session(driver, session) as db_session:
+        updated_items = await db_session.execute_write(
             _update_category_items_tx, session_id, category_id, items
         )
     return updated_items
 
 
-def _update_category_items_tx(
+async def _update_category_items_tx(
     tx, session_id: str, category_id: str, items: List[TSItem]
 ) -> List[ItemModel]:
     """
@@ -309,40 +534,32 @@ def _update_category_items_tx(
     Returns:
         List[ItemModel]: List of updated or created items.
     """
-    input_item_ids = set(item.id for item in items)
-
-    # Get existing items in the category
-    existing_items_query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM)<-[:CONTAINS]-(c:CATEGORY {id: $category_id})
-    RETURN i.id AS id
-    """
-    existing_items_result = tx.run(
-        existing_items_query, session_id=session_id, category_id=category_id
+    rows = [
+        {
+            "id": item.id,
+            "id_": uuid.uuid4().hex,
+            "properties": serialize_properties(item),
+        }
+        for item in items
+    ]
+
+    # In one statement: delete the category's items missing from the input,
+    # upsert the input items and move them into the category. Existing items
+    # keep their id_; new ones get a fresh one
+    result = await tx.run(
+        _SET_CATEGORY_ITEMS_CYPHER,
+        session_id=session_id,
+        category_id=category_id,
+        item_ids=[row["id"] for row in rows],
+        rows=rows,
     )
-    existing_item_ids = set(record["id"] for record in existing_items_result)
-
-    # Determine items to create, update, and delete
-    items_to_create = [item for item in items if item.id not in existing_item_ids]
-    items_to_update = [item for item in items if item.id in existing_item_ids]
-    items_to_delete_ids = list(existing_item_ids - input_item_ids)
-
-    # Delete surplus items from the session
-    if items_to_delete_ids:
-        _delete_item_tx(tx, session_id, items_to_delete_ids)
-
-    # Update existing items
-    updated_items = []
-    for item in items_to_update:
-        try:
-            updated_item = _update_item_tx(tx, session_id, item, category_id)
-            updated_items.append(updated_item)
-        except ValueError as ve:
-            # Item does not exist; raise an error
-            raise ve
-
-    # Create new items and associate them with the category
-    for item in items_to_create:
-        created_item = _create_item_tx(tx, session_id, item, category_id)
-        updated_items.append(created_item)
+    stored_ids = {record["id"]: record["id_"] async for record in result}
+    for row in rows:
+        row["id_"] = stored_ids.get(row["id"], row["id_"])
 
-    return updated_items
+    return [
+        ItemModel.model_construct(
+            id_=row["id_"], id=row["id"], properties=row["properties"]
+        )
+        for row in rows
+    ]
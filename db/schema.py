@@ -0,0 +1,51 @@
+# db/schema.py
+
+from neo4j import AsyncDriver
+
+# Constraints backing the id lookups used by the handlers. Each uniqueness
+# constraint also creates an index, so `MATCH (c:CATEGORY {id: $id})` and
+# friends become index seeks instead of label scans.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT session_id IF NOT EXISTS FOR (s:SESSION) REQUIRE s.id IS UNIQUE",
+    "CREATE CONSTRAINT category_id IF NOT EXISTS FOR (c:CATEGORY) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT item_id_ IF NOT EXISTS FOR (i:ITEM) REQUIRE i.id_ IS UNIQUE",
+    # Item ids come from the client and are only unique within a session, so
+    # they are unique together with the session id rather than on their own
+    "CREATE INDEX item_id IF NOT EXISTS FOR (i:ITEM) ON (i.id)",
+    "CREATE CONSTRAINT item_session_id_id IF NOT EXISTS FOR (i:ITEM) "
+    "REQUIRE (i.session_id, i.id) IS UNIQUE",
+]
+
+# Data migrations run after the schema statements. Each one only touches
+# nodes that still need it, so re-running them is a no-op.
+MIGRATION_STATEMENTS = [
+    # Categories created before `session_id` was stored on the node
+    """
+    MATCH (s:SESSION)-[:HAS]->(c:CATEGORY)
+    WHERE c.session_id IS NULL
+    SET c.session_id = s.id
+    """,
+    # Items created before `session_id` was stored on the node
+    """
+    MATCH (s:SESSION)-[:HAS]->(i:ITEM)
+    WHERE i.session_id IS NULL
+    SET i.session_id = s.id
+    """,
+]
+
+
+async def ensure_schema(driver: AsyncDriver) -> None:
+    """
+    Creates the constraints and indexes the handlers rely on, if missing, and
+    backfills properties older data may lack.
+
+    Safe to call on every startup since every statement is `IF NOT EXISTS` or
+    only matches nodes that have not been migrated yet.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+    """
+    async with driver.session() as session:
+        for statement in SCHEMA_STATEMENTS + MIGRATION_STATEMENTS:
+            result = await session.run(statement)
+            await result.consume()
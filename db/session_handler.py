@@ -1,7 +1,9 @@
 # db/session_handler.py
 
-import json
-from neo4j import Driver
+import orjson
+from collections import OrderedDict
+from neo4j import READ_ACCESS, AsyncDriver
+from typing import Optional, Tuple
 from pydantic import BaseModel
 import uuid
 from db.category_handler import Position, create_category
@@ -11,81 +13,173 @@ class SessionModel(BaseModel):
     id: str
 
 
-def create_session(driver: Driver) -> SessionModel:
-    session_id = str(uuid.uuid4())
-    # make session_id url safe
-    session_id = session_id.replace("-", "")
-    with driver.session() as db_session:
-        db_session.execute_write(_create_session_tx, session_id)
+# Maximum number of sessions whose data is kept in the in-process cache
+SESSION_DATA_CACHE_SIZE = 256
+
+# session_id -> (SESSION.version, session data), least recently used first.
+# The version is bumped by every write to the session, so an entry is only
+# served while the graph is unchanged, whichever process wrote to it.
+_session_data_cache: "OrderedDict[str, Tuple[int, dict]]" = OrderedDict()
+
+# Cypher statements are module constants so every call sends the same query
+# text and hits the server's query plan cache
+_CREATE_SESSION_CYPHER = """
+CREATE (s:SESSION {id: $id, version: 0})
+"""
+
+_CREATE_HAS_ROOT_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+MATCH (c:CATEGORY {id: $category_id})
+CREATE (s)-[:HAS_ROOT]->(c)
+"""
+
+_SESSION_VERSION_CYPHER = """
+MATCH (s:SESSION {id: $session_id})
+RETURN s.version AS version
+"""
+
+# Categories with their parent and contained items, plus one row collecting
+# the items not contained in any category
+_SESSION_DATA_CYPHER = """
+MATCH (s:SESSION {id: $session_id})-[:HAS]->(c:CATEGORY)
+OPTIONAL MATCH (c)-[:IS_CHILD_OF]->(parent:CATEGORY)
+OPTIONAL MATCH (c)-[:CONTAINS]->(i:ITEM)
+RETURN c, parent, collect(DISTINCT i) as items
+UNION ALL
+MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM)
+WHERE NOT (:CATEGORY)-[:CONTAINS]->(i)
+RETURN null as c, null as parent, collect(i) as items
+"""
+
+
+async def create_session(driver: AsyncDriver) -> SessionModel:
+    # The hex form has no dashes, so the id is url safe
+    session_id = uuid.uuid4().hex
+    # Write the SESSION node, root category and HAS_ROOT in one managed
+    # transaction, which the driver retries on transient errors
+    async with driver.session() as session:
+        await session.execute_write(_create_session_with_root_tx, driver, session_id)
+
+    return SessionModel(id=session_id)
+
+
+async def _create_session_with_root_tx(tx, driver: AsyncDriver, session_id: str):
+    await _create_session_tx(tx, session_id)
 
     # Create a root category with template inputs
-    root_category = create_category(
+    root_category = await create_category(
         driver,
         name="Root Category",
         description="This is the root category",
         position=Position(x=0, y=0),
         session_id=session_id,
+        tx=tx,
     )
 
     # Create HAS_ROOT relationship between the session and root category
-    with driver.session() as db_session:
-        db_session.execute_write(
-            _create_has_root_relationship_tx, session_id, root_category.id
+    await _create_has_root_relationship_tx(tx, session_id, root_category.id)
+
+
+async def _create_session_tx(tx, session_id: str):
+    await (await tx.run(_CREATE_SESSION_CYPHER, id=session_id)).consume()
+
+
+async def _create_has_root_relationship_tx(tx, session_id: str, category_id: str):
+    await (
+        await tx.run(
+            _CREATE_HAS_ROOT_CYPHER,
+            session_id=session_id,
+            category_id=category_id,
         )
+    ).consume()
 
-    return SessionModel(id=session_id)
 
+async def get_session_data(driver: AsyncDriver, session_id: str):
+    _, session_data = await get_session_snapshot(driver, session_id)
+    return session_data
 
-def _create_session_tx(tx, session_id: str):
-    tx.run(
-        """
-        CREATE (s:SESSION {id: $id})
-        """,
-        id=session_id,
-    )
 
+async def get_session_snapshot(
+    driver: AsyncDriver, session_id: str, known_version: Optional[int] = None
+) -> Tuple[Optional[int], Optional[dict]]:
+    """
+    Returns the current version of a session together with its data.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        session_id (str): ID of the session.
+        known_version (Optional[int]): Version the caller already has the data
+            of; if it is still current, the data is not loaded.
+
+    Returns:
+        Tuple[Optional[int], Optional[dict]]: The session version (None if the
+        session does not exist) and its data (None if `known_version` is
+        current).
+    """
+    # Read-only session, so clustered deployments can route it to a read replica
+    async with driver.session(default_access_mode=READ_ACCESS) as session:
+        # Check the session version first; the full traversal only runs when
+        # the session changed since it was last cached
+        version_record = await session.execute_read(_get_session_version_tx, session_id)
+        if version_record is None:
+            # Unknown session, there is nothing to load
+            return None, {"tree": [], "orphan_items": []}
+        version = version_record["version"] or 0
+        if version == known_version:
+            return version, None
+
+        cached = _session_data_cache.get(session_id)
+        if cached is not None and cached[0] == version:
+            _session_data_cache.move_to_end(session_id)
+            return version, cached[1]
 
-def _create_has_root_relationship_tx(tx, session_id: str, category_id: str):
-    tx.run(
-        """
-        MATCH (s:SESSION {id: $session_id}), (c:CATEGORY {id: $category_id})
-        CREATE (s)-[:HAS_ROOT]->(c)
-        """,
-        session_id=session_id,
-        category_id=category_id,
-    )
+        result = await session.execute_read(_get_session_data_tx, session_id)
 
+    _session_data_cache[session_id] = (version, result)
+    _session_data_cache.move_to_end(session_id)
+    if len(_session_data_cache) > SESSION_DATA_CACHE_SIZE:
+        _session_data_cache.popitem(last=False)
+    return version, result
 
-def get_session_data(driver: Driver, session_id: str):
-    with driver.session() as session:
-        result = session.execute_read(_get_session_data_tx, session_id)
-        return result
 
+async def _get_session_version_tx(tx, session_id: str):
+    result = await tx.run(_SESSION_VERSION_CYPHER, session_id=session_id)
+    return await result.single()
 
-def _get_session_data_tx(tx, session_id: str):
-    # Query to get categories, their parent relationships, and contained items
-    query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(c:CATEGORY)
-    OPTIONAL MATCH (c)-[:IS_CHILD_OF]->(parent:CATEGORY)
-    OPTIONAL MATCH (c)-[:CONTAINS]->(i:ITEM)
-    RETURN c, parent, collect(DISTINCT i) as items
-    """
-    records = tx.run(query, session_id=session_id).data()
+
+async def _get_session_data_tx(tx, session_id: str):
+    result = await tx.run(_SESSION_DATA_CYPHER, session_id=session_id)
 
     # Dictionaries to hold categories and their relationships
     categories = {}
     category_parents = {}
 
-    for record in records:
+    orphan_items = []
+
+    # Stream the records and read node properties directly instead of
+    # materializing everything with `.data()` first
+    async for record in result:
         category_node = record["c"]
-        parent_node = record.get("parent")
+        parent_node = record["parent"]
         item_nodes = record["items"]
 
+        if category_node is None:
+            # Items not contained in any category
+            for item_node in item_nodes:
+                item_id = item_node["id"]
+                properties = orjson.loads(item_node["properties"])
+                item = {"id": item_id, **properties}
+                orphan_items.append(item)
+            continue
+
+        # Build the response node directly; children are linked in below
         category_id = category_node["id"]
         category = {
-            "id": category_id,
-            "name": category_node["name"],
-            "description": category_node["description"],
+            "value": {
+                "id": category_id,
+                "name": category_node["name"],
+                "description": category_node["description"],
+            },
             "children": [],
             "items": [],
             "position": {
@@ -103,52 +197,23 @@ def _get_session_data_tx(tx, session_id: str):
         for item_node in item_nodes:
             if item_node:
                 item_id = item_node["id"]
-                properties = json.loads(item_node["properties"])
+                properties = orjson.loads(item_node["properties"])
                 item = {"id": item_id, **properties}
                 category["items"].append(item)
 
-    # Build the category tree
+    # Build the category tree in a single pass over the parent links
     for category_id, parent_id in category_parents.items():
         if parent_id in categories:
             parent_category = categories[parent_id]
             child_category = categories[category_id]
             parent_category["children"].append(child_category)
 
-    # Identify root categories (categories without parents)
-    root_categories = [
+    # Identify root categories (categories without parents). The nodes are
+    # shared by reference, so no recursive pass over the tree is needed
+    tree_nodes = [
         category
         for category_id, category in categories.items()
         if category_id not in category_parents
     ]
 
-    # Prepare the data for response
-    def build_tree_node(category_dict):
-        return {
-            "value": {
-                "id": category_dict["id"],
-                "name": category_dict["name"],
-                "description": category_dict["description"],
-            },
-            "children": [build_tree_node(child) for child in category_dict["children"]],
-            "items": category_dict["items"],
-            "position": category_dict["position"],
-        }
-
-    tree_nodes = [build_tree_node(category) for category in root_categories]
-
-    # request all items with (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM) except those that are contained in a category
-    orphan_items = []
-    query = """
-    MATCH (s:SESSION {id: $session_id})-[:HAS]->(i:ITEM)
-    WHERE NOT (:CATEGORY)-[:CONTAINS]->(i)
-    RETURN i
-    """
-    records = tx.run(query, session_id=session_id).data()
-    for record in records:
-        item_node = record["i"]
-        item_id = item_node["id"]
-        properties = json.loads(item_node["properties"])
-        item = {"id": item_id, **properties}
-        orphan_items.append(item)
-
     return {"tree": tree_nodes, "orphan_items": orphan_items}
@@ -0,0 +1,53 @@
+# db/transactions.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from neo4j import AsyncDriver, AsyncSession
+
+
+@asynccontextmanager
+async def use_session(
+    driver: AsyncDriver, session: Optional[AsyncSession] = None
+) -> AsyncIterator[AsyncSession]:
+    """
+    Yields the given session, or opens a new one for the duration of the block.
+
+    Lets callers that issue several handler calls in a row (e.g. creating a
+    session and its root category) share one session instead of leasing a
+    connection and setting up a session per call.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        session (Optional[AsyncSession]): Already open session to reuse.
+
+    Yields:
+        AsyncSession: The session to run the work in.
+    """
+    if session is not None:
+        yield session
+        return
+    async with driver.session() as new_session:
+        yield new_session
+
+
+async def warm_up(driver: AsyncDriver, connections: int) -> None:
+    """
+    Verifies connectivity and opens `connections` pooled connections up front.
+
+    Runs a trivial query on that many concurrent sessions, so each one leases
+    its own connection and the pool keeps them for the first requests instead
+    of paying TCP, TLS and authentication setup on them.
+
+    Args:
+        driver (AsyncDriver): Neo4j driver instance.
+        connections (int): Number of connections to open.
+    """
+    await driver.verify_connectivity()
+
+    async def ping() -> None:
+        async with driver.session() as session:
+            result = await session.run("RETURN 1")
+            await result.consume()
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
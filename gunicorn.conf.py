@@ -0,0 +1,19 @@
+# gunicorn.conf.py
+#
+# Production server: gunicorn main:app
+#
+# Each worker is a uvicorn process with its own event loop, on uvloop and
+# httptools when they are installed (see requirements.txt). The endpoints spend
+# most of their time waiting on OpenAI and Neo4j, so one worker per core is
+# enough; concurrency within a worker comes from asyncio.
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:4000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Leave the lifespan shutdown enough time to run the queued background writes
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
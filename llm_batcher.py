@@ -0,0 +1,146 @@
+# llm_batcher.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from taxonomy_synthesis.models import Category, ClassifiedItem, Item
+
+# Classifier call: (api_key, items, categories, batch_size) -> classified items
+ClassifyFunc = Callable[
+    [str, List[Item], List[Category], Optional[int]], Awaitable[List[ClassifiedItem]]
+]
+
+
+class _PendingBatch:
+    def __init__(
+        self, api_key: str, categories: List[Category], batch_size: Optional[int]
+    ):
+        self.api_key = api_key
+        self.categories = categories
+        self.batch_size = batch_size
+        self.entries: List[Tuple[List[Item], asyncio.Future]] = []
+        self.item_count = 0
+
+
+class ClassifyBatcher:
+    """
+    Coalesces concurrent classification requests into a single classifier call.
+
+    Requests that arrive within `max_wait` seconds of each other and share the
+    same API key, categories and batch size are merged into one batch of at most
+    `max_items` items. The batch is classified with one `classify_func` call
+    and the results are split back to each caller.
+
+    Items are re-id'd per request while batched, so requests that use the
+    same item ids do not collide. Items that several requests of a batch send
+    unchanged are classified once and their result shared.
+    """
+
+    def __init__(
+        self,
+        classify_func: ClassifyFunc,
+        max_wait: float = 0.075,
+        max_items: int = 200,
+    ):
+        self.classify_func = classify_func
+        self.max_wait = max_wait
+        self.max_items = max_items
+        self._pending: Dict[Tuple, _PendingBatch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def classify(
+        self,
+        api_key: str,
+        items: List[Item],
+        categories: List[Category],
+        batch_size: Optional[int] = None,
+    ) -> List[ClassifiedItem]:
+        """
+        Classifies `items` into `categories`, batched with concurrent requests.
+
+        Args:
+            api_key (str): OpenAI API key of the request.
+            items (List[Item]): Items to classify.
+            categories (List[Category]): Categories to classify the items into.
+            batch_size (Optional[int]): Items per completion, None for the
+                classifier's default.
+
+        Returns:
+            List[ClassifiedItem]: The classified items of this request.
+        """
+        loop = asyncio.get_running_loop()
+        key = (
+            api_key,
+            batch_size,
+            tuple(category.model_dump_json() for category in categories),
+        )
+
+        batch = self._pending.get(key)
+        if batch is not None and batch.item_count + len(items) > self.max_items:
+            # Adding this request would overflow the batch, send it now
+            self._flush(key)
+            batch = None
+        if batch is None:
+            batch = _PendingBatch(api_key, categories, batch_size)
+            self._pending[key] = batch
+            loop.call_later(self.max_wait, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.entries.append((items, future))
+        batch.item_count += len(items)
+        if batch.item_count >= self.max_items:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Tuple, batch: Optional[_PendingBatch] = None) -> None:
+        # Timers of batches that were already sent early find another batch
+        # (or none) under the key and do nothing
+        if key not in self._pending or (
+            batch is not None and self._pending[key] is not batch
+        ):
+            return
+        task = asyncio.ensure_future(self._run(self._pending.pop(key)))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _PendingBatch) -> None:
+        # Prefix item ids with the request index so they stay unique, and
+        # send identical items of different requests only once
+        batched_items = []
+        batched_ids: Dict[str, str] = {}
+        targets: Dict[str, List[Tuple[int, int, Item]]] = {}
+        for index, (items, _) in enumerate(batch.entries):
+            for position, item in enumerate(items):
+                item_json = item.model_dump_json()
+                batched_id = batched_ids.get(item_json)
+                if batched_id is None:
+                    batched_id = f"{index}:{item.id}"
+                    batched_ids[item_json] = batched_id
+                    batched_items.append(
+                        Item(**{**item.model_dump(), "id": batched_id})
+                    )
+                targets.setdefault(batched_id, []).append((index, position, item))
+
+        try:
+            classified_items = await self.classify_func(
+                batch.api_key, batched_items, batch.categories, batch.batch_size
+            )
+        except Exception as e:
+            for _, future in batch.entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Each request gets its results in the order of its items
+        results: List[List[ClassifiedItem]] = [
+            [None] * len(items) for items, _ in batch.entries
+        ]
+        for classified_item in classified_items:
+            for index, position, item in targets[classified_item.item.id]:
+                results[index][position] = ClassifiedItem(
+                    item=item, category=classified_item.category
+                )
+        for (_, future), result in zip(batch.entries, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,122 @@
+# llm_cache.py
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+import orjson
+
+
+def make_cache_key(kind: str, payload: Any) -> str:
+    """
+    Builds an exact-match cache key for an LLM request.
+
+    Args:
+        kind (str): Name of the operation, so different endpoints never share keys.
+        payload (Any): JSON-serializable request inputs that determine the result.
+
+    Returns:
+        str: Hex digest of the kind and the canonical JSON of the payload.
+    """
+    data = orjson.dumps([kind, payload], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded in-process cache whose entries expire `ttl` seconds after being set.
+
+    Least recently used entries are evicted once `maxsize` is reached. A `ttl`
+    or `maxsize` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheBackend(Protocol):
+    """
+    Async key-value store of string values shared by concurrent requests.
+    """
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]: ...
+
+    async def set_many(self, values: Dict[str, str]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryBackend:
+    """
+    `CacheBackend` on an in-process `TTLCache`, private to the worker process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [self._cache.get(key) for key in keys]
+
+    async def set_many(self, values: Dict[str, str]) -> None:
+        for key, value in values.items():
+            self._cache.set(key, value)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class RedisBackend:
+    """
+    `CacheBackend` on Redis, shared by every worker process and instance.
+
+    Entries expire `ttl` seconds after being set. Requires the `redis` package.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "taxonomy:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        values = await self._redis.mget([self.prefix + key for key in keys])
+        return [value.decode() if value is not None else None for value in values]
+
+    async def set_many(self, values: Dict[str, str]) -> None:
+        if not values or self.ttl <= 0:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(self.prefix + key, value, ex=self.ttl)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
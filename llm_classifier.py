@@ -0,0 +1,396 @@
+# llm_classifier.py
+
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from openai import APIStatusError, AsyncOpenAI
+from taxonomy_synthesis.models import Category, ClassifiedItem, Item
+
+from llm_rate_limit import RateLimiter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_MODEL = "gpt-4o-mini"
+
+# Completion tokens of one item's row in the reply, for the rate limiter
+_COMPLETION_TOKENS_PER_ITEM = 20
+
+# Replies longer than this are parsed in a worker thread instead of on the
+# event loop; shorter ones parse faster than the hand-off to a thread
+_OFFLOAD_PARSE_CHARS = 256 * 1024
+
+# The categories lead the prompt and are the same for every chunk of a
+# request, so OpenAI's prompt caching serves them after the first chunk once
+# they are 1024 tokens or longer
+_SYSTEM_PROMPT = """I will provide you with items and categories. You need to classify the items into the correct category.
+CATEGORIES:
+```
+{categories}
+```"""  # noqa: E501
+
+_ITEMS_PROMPT = """ITEMS:
+```
+{items}
+```"""
+
+
+class BatchClassifier:
+    """
+    Classifies items with one chat completion per chunk of `batch_size` items.
+
+    Each prompt only lists the items of its own chunk, and the chunks are sent
+    concurrently on an `AsyncOpenAI` client. The categories are serialized
+    once per call into a system prompt that every chunk shares as its
+    cacheable prefix. The reply is constrained by a strict JSON schema whose
+    enums are the chunk's item ids and the category names, so it can be
+    mapped back without lookups failing. Items the model leaves out, or whose
+    chunk failed, are classified again in a smaller follow-up call, up to
+    `max_attempts` rounds.
+
+    At most `max_concurrency` completions of the classifier are in flight at
+    once, across all requests that share it, and each completion waits for
+    the optional `rate_limiter` before it is sent.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        batch_size: int = 50,
+        max_attempts: int = 3,
+        max_concurrency: int = 32,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.rate_limiter = rate_limiter
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def classify_items(
+        self,
+        items: List[Item],
+        categories: List[Category],
+        batch_size: Optional[int] = None,
+    ) -> List[ClassifiedItem]:
+        """
+        Classifies `items` into `categories`.
+
+        Args:
+            items (List[Item]): Items to classify. Item ids must be unique.
+            categories (List[Category]): Categories to classify the items into.
+            batch_size (Optional[int]): Items per completion instead of the
+                classifier's `batch_size`.
+
+        Returns:
+            List[ClassifiedItem]: One classified item per input item, in input order.
+        """
+        classified: Dict[str, ClassifiedItem] = {}
+        async with aclosing(
+            self.iter_classify_items(items, categories, batch_size)
+        ) as chunks:
+            async for chunk_items in chunks:
+                for classified_item in chunk_items:
+                    classified[classified_item.item.id] = classified_item
+        return [classified[item.id] for item in items]
+
+    async def iter_classify_items(
+        self,
+        items: List[Item],
+        categories: List[Category],
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[List[ClassifiedItem]]:
+        """
+        Classifies `items` into `categories`, yielding each chunk's classified
+        items as soon as its completion returns.
+
+        Args:
+            items (List[Item]): Items to classify. Item ids must be unique.
+            categories (List[Category]): Categories to classify the items into.
+            batch_size (Optional[int]): Items per completion instead of the
+                classifier's `batch_size`.
+
+        Yields:
+            List[ClassifiedItem]: The newly classified items of one chunk.
+        """
+        categories_by_name = {category.name: category for category in categories}
+        items_by_id = {item.id: item for item in items}
+        classified_ids = set()
+
+        categories_prompt = _categories_prompt(categories)
+        batch_size = batch_size or self.batch_size
+        pending = items
+        error = None
+        for _ in range(self.max_attempts):
+            tasks = [
+                asyncio.ensure_future(
+                    self._classify_chunk(
+                        pending[i : i + batch_size], categories, categories_prompt
+                    )
+                )
+                for i in range(0, len(pending), batch_size)
+            ]
+            try:
+                # A failed chunk does not fail the others; its items are retried
+                for next_result in asyncio.as_completed(tasks):
+                    try:
+                        result = await next_result
+                    except Exception as e:
+                        if _is_permanent(e):
+                            raise
+                        logger.warning("Classifying a chunk failed: %s", e)
+                        error = e
+                        continue
+                    chunk_items = []
+                    for item_id, category_name in result.items():
+                        if item_id in classified_ids:
+                            continue
+                        classified_ids.add(item_id)
+                        chunk_items.append(
+                            ClassifiedItem(
+                                item=items_by_id[item_id],
+                                category=categories_by_name[category_name],
+                            )
+                        )
+                    yield chunk_items
+            finally:
+                # Stop the remaining completions if the caller stops early,
+                # is cancelled or closes the generator, and wait for them to
+                # finish cancelling so none outlives the call
+                pending_tasks = [task for task in tasks if not task.done()]
+                for task in pending_tasks:
+                    task.cancel()
+                if pending_tasks:
+                    await asyncio.gather(*pending_tasks, return_exceptions=True)
+            pending = [item for item in pending if item.id not in classified_ids]
+            if not pending:
+                return
+
+        if error is not None:
+            raise error
+        raise ValueError(
+            f"Model did not classify items: {[item.id for item in pending]}"
+        )
+
+    async def submit_batch(
+        self,
+        items: List[Item],
+        categories: List[Category],
+        batch_size: Optional[int] = None,
+    ) -> str:
+        """
+        Submits the classification to the OpenAI Batch API instead of running it.
+
+        Each chunk becomes one request line of the batch's input file. Batch
+        requests cost half as much and have their own rate limits, but finish
+        within 24 hours rather than right away.
+
+        Args:
+            items (List[Item]): Items to classify. Item ids must be unique.
+            categories (List[Category]): Categories to classify the items into.
+            batch_size (Optional[int]): Items per request instead of the
+                classifier's `batch_size`.
+
+        Returns:
+            str: ID of the OpenAI batch, to pass to `batch_result`.
+        """
+        categories_prompt = _categories_prompt(categories)
+        batch_size = batch_size or self.batch_size
+        lines = [
+            orjson.dumps(
+                {
+                    "custom_id": f"chunk-{index}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": _chunk_request(
+                        items[i : i + batch_size], categories, categories_prompt
+                    ),
+                }
+            )
+            for index, i in enumerate(range(0, len(items), batch_size))
+        ]
+        input_file = await self.client.files.create(
+            file=("classify_items.jsonl", b"\n".join(lines)), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def batch_result(
+        self, batch_id: str
+    ) -> Tuple[str, Optional[List[ClassifiedItem]], List[Item]]:
+        """
+        Returns the status of a batch submitted with `submit_batch`.
+
+        The items and categories are read back from the batch's input file, so
+        the result can be assembled by any process holding the API key.
+
+        Args:
+            batch_id (str): ID of the OpenAI batch.
+
+        Returns:
+            Tuple[str, Optional[List[ClassifiedItem]], List[Item]]: The batch
+            status, the classified items once it is completed (None before),
+            and the items no successful request classified.
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            return batch.status, None, []
+
+        output_text = ""
+        if batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            output_text = output.text
+        input_file = await self.client.files.content(batch.input_file_id)
+        # The files hold every chunk of the batch, so reading them back can
+        # take long enough to stall other requests on the event loop
+        classified_items, unclassified_items = await asyncio.to_thread(
+            _batch_items, input_file.text, output_text
+        )
+        return batch.status, classified_items, unclassified_items
+
+    async def _classify_chunk(
+        self, items: List[Item], categories: List[Category], categories_prompt: str
+    ) -> Dict[str, str]:
+        request = _chunk_request(items, categories, categories_prompt)
+        async with self._semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(
+                    sum(
+                        estimate_tokens(message["content"])
+                        for message in request["messages"]
+                    )
+                    + _COMPLETION_TOKENS_PER_ITEM * len(items)
+                )
+            response = await self.client.chat.completions.create(**request)
+        if not response.choices or not response.choices[0].message.content:
+            raise ValueError("Model response is missing the expected structure.")
+        content = response.choices[0].message.content
+        if len(content) > _OFFLOAD_PARSE_CHARS:
+            return await asyncio.to_thread(_parse_assignments, content)
+        return _parse_assignments(content)
+
+
+def _categories_prompt(categories: List[Category]) -> str:
+    return _SYSTEM_PROMPT.format(
+        categories=orjson.dumps(
+            [category.model_dump() for category in categories]
+        ).decode()
+    )
+
+
+# Body of the chat completion that classifies one chunk
+def _chunk_request(
+    items: List[Item], categories: List[Category], categories_prompt: str
+) -> dict:
+    items_prompt = _ITEMS_PROMPT.format(
+        items=orjson.dumps([item.model_dump() for item in items]).decode()
+    )
+    return {
+        "model": CLASSIFIER_MODEL,
+        "messages": [
+            {"role": "system", "content": categories_prompt},
+            {"role": "user", "content": items_prompt},
+        ],
+        # Same inputs, same labels, so classifications can be cached
+        "temperature": 0,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "classifier",
+                "strict": True,
+                "schema": _response_schema(
+                    [item.id for item in items],
+                    [category.name for category in categories],
+                ),
+            },
+        },
+    }
+
+
+# Reads the items and categories back out of a `_chunk_request` body. Both are
+# dumped on a single line of their fenced block, as orjson escapes newlines.
+# Batches submitted with the earlier single-message prompt are read the same way.
+def _chunk_inputs(body: dict) -> Tuple[List[Item], List[Category]]:
+    prompt = "\n".join(message["content"] for message in body["messages"])
+    items_json = prompt.split("ITEMS:\n```\n", 1)[1].split("\n", 1)[0]
+    categories_json = prompt.split("CATEGORIES:\n```\n", 1)[1].split("\n", 1)[0]
+    return (
+        [Item(**item) for item in orjson.loads(items_json)],
+        [Category(**category) for category in orjson.loads(categories_json)],
+    )
+
+
+# Pairs the items of a batch's input file with the categories of its output
+# file. Items of failed or missing requests are returned as unclassified.
+def _batch_items(
+    input_text: str, output_text: str
+) -> Tuple[List[ClassifiedItem], List[Item]]:
+    assignments: Dict[str, str] = {}
+    for line in output_text.splitlines():
+        response = orjson.loads(line).get("response")
+        if not response or response["status_code"] != 200:
+            continue
+        message = response["body"]["choices"][0]["message"]
+        if message.get("content"):
+            assignments.update(_parse_assignments(message["content"]))
+
+    classified_items = []
+    unclassified_items = []
+    for line in input_text.splitlines():
+        items, categories = _chunk_inputs(orjson.loads(line)["body"])
+        categories_by_name = {category.name: category for category in categories}
+        for item in items:
+            category_name = assignments.get(item.id)
+            if category_name is None:
+                unclassified_items.append(item)
+            else:
+                classified_items.append(
+                    ClassifiedItem(
+                        item=item, category=categories_by_name[category_name]
+                    )
+                )
+    return classified_items, unclassified_items
+
+
+def _parse_assignments(content: str) -> Dict[str, str]:
+    return {
+        row["item_id"]: row["category_name"]
+        for row in orjson.loads(content)["classified_items"]
+    }
+
+
+# Client errors other than rate limiting fail every retry the same way
+def _is_permanent(error: BaseException) -> bool:
+    return (
+        isinstance(error, APIStatusError)
+        and 400 <= error.status_code < 500
+        and error.status_code != 429
+    )
+
+
+def _response_schema(item_ids: List[str], category_names: List[str]) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "classified_items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "item_id": {"type": "string", "enum": item_ids},
+                        "category_name": {"type": "string", "enum": category_names},
+                    },
+                    "required": ["item_id", "category_name"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["classified_items"],
+        "additionalProperties": False,
+    }
@@ -0,0 +1,135 @@
+# llm_generator.py
+
+import logging
+from typing import List, Optional
+
+import orjson
+from openai import AsyncOpenAI
+from taxonomy_synthesis.generator.taxonomy_generator import TaxonomyGenerator
+from taxonomy_synthesis.models import Category, Item
+
+from llm_rate_limit import RateLimiter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+GENERATOR_MODEL = "gpt-4o-mini"
+
+# Upper bound on the items' characters in the prompt, ~60000 tokens at the
+# upstream estimate of three characters per token
+MAX_ITEM_CHARS = 180000
+
+_SUBCATEGORIES_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "subcategories_list",
+        "strict": True,
+        "parameters": {
+            "$defs": {
+                "category": {
+                    "description": "Category for items.",
+                    "properties": {
+                        "name": {
+                            "description": "Name of the category.",
+                            "type": "string",
+                        },
+                        "description": {
+                            "description": "Description and instruction for how to use this category.",  # noqa: E501
+                            "type": "string",
+                        },
+                    },
+                    "required": ["name", "description"],
+                    "type": "object",
+                    "additionalProperties": False,
+                }
+            },
+            "description": "Matches the item with its category.",
+            "properties": {
+                "categories": {
+                    "description": "List of categories to match the item with.",
+                    "items": {"$ref": "#/$defs/category"},
+                    "type": "array",
+                }
+            },
+            "required": ["categories"],
+            "type": "object",
+            "additionalProperties": False,
+        },
+        "description": "Matches the item with its category.",
+    },
+}
+
+
+class AsyncTaxonomyGenerator(TaxonomyGenerator):
+    """
+    `TaxonomyGenerator` that awaits an `AsyncOpenAI` client.
+
+    The prompt comes from the upstream `initialize_chat` and the function
+    schema matches the upstream one, so the generated categories are the same;
+    only the completion call no longer blocks a thread.
+
+    Each call works on its own copy of the prompt, so one generator can serve
+    concurrent requests with the same settings. Completions wait for the
+    optional `rate_limiter` before they are sent.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        generation_method: str = "",
+        max_categories: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        super().__init__(
+            client=client,
+            generation_method=generation_method,
+            max_categories=max_categories,
+        )
+        self.rate_limiter = rate_limiter
+
+    async def agenerate_categories(
+        self, items: List[Item], parent_category: Category
+    ) -> List[Category]:
+        """
+        Generates subcategories of `parent_category` for `items`.
+
+        Args:
+            items (List[Item]): Items inside the parent category.
+            parent_category (Category): Category to create subcategories of.
+
+        Returns:
+            List[Category]: At most `max_categories` new categories.
+        """
+        # Keep the prompt under the token budget, counting each item's share
+        # of the upstream estimate instead of re-measuring the whole list
+        kept_chars = 0
+        for count, item in enumerate(items):
+            kept_chars += len(str(item.model_dump())) + 2
+            if kept_chars > MAX_ITEM_CHARS:
+                logger.warning("Items truncated to just under 60000 tokens")
+                items = items[:count]
+                break
+
+        self.initialize_chat(items, parent_category)
+        # Taken before awaiting, as other requests reset the chat history
+        messages = self.chat_history
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(
+                sum(estimate_tokens(str(message["content"])) for message in messages)
+            )
+        response = await self.client.chat.completions.create(
+            model=GENERATOR_MODEL,
+            messages=messages,
+            tools=[_SUBCATEGORIES_TOOL],
+        )
+
+        if not response.choices or not response.choices[0].message.tool_calls:
+            raise ValueError("Model response is missing the expected structure.")
+        tool_call = response.choices[0].message.tool_calls[0]
+        if tool_call.function.arguments is None:
+            raise ValueError("Tool call arguments are missing in the model response.")
+
+        categories_data = orjson.loads(tool_call.function.arguments)
+        categories = [Category(**cat) for cat in categories_data["categories"]]
+        if self.max_categories:
+            return categories[: self.max_categories]
+        return categories
@@ -0,0 +1,70 @@
+# llm_rate_limit.py
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket holding up to `capacity` tokens, refilled at `rate`
+    tokens per second.
+
+    Waiters are served in arrival order, so a large request is not starved by
+    a stream of small ones. A `rate` of 0 disables the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        if self.rate <= 0:
+            return
+        # A request larger than the bucket waits for a full bucket instead of
+        # waiting forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Keeps OpenAI calls within a requests-per-minute and a tokens-per-minute
+    limit, so bursts of concurrent completions wait here instead of failing
+    with 429s and backing off.
+
+    The limits apply to the calls in this process only. With several worker
+    processes sharing an API key, give each its share of the account's limits.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self._requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Waits until a call with an estimated `tokens` tokens may be sent.
+
+        Args:
+            tokens (int): Estimated prompt and completion tokens of the call.
+        """
+        await self._requests.acquire(1)
+        await self._tokens.acquire(tokens)
+
+
+# Rough token count of a prompt, at the upstream estimate of three characters
+# per token
+def estimate_tokens(text: str) -> int:
+    return len(text) // 3 + 1
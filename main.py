@@ -1,21 +1,24 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional, Type, TypeVar
 
 from taxonomy_synthesis.models import Category, Item, ClassifiedItem
-from taxonomy_synthesis.tree.tree_node import TreeNode
-from taxonomy_synthesis.tree.node_operator import NodeOperator
-from taxonomy_synthesis.generator.taxonomy_generator import TaxonomyGenerator
-from taxonomy_synthesis.classifiers.gpt_classifier import GPTClassifier
 from fastapi.middleware.cors import CORSMiddleware
-from neo4j import GraphDatabase
-from openai import OpenAI
-from dotenv import load_dotenv
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from neo4j import AsyncGraphDatabase
+from openai import AsyncOpenAI, RateLimitError
 
-import os
+import asyncio
+import functools
+import httpx
+import logging
+import orjson
 
 from db.category_handler import (
     CategoryModel,
@@ -26,20 +29,41 @@ from db.category_handler import (
 )
 from db.item_handler import (
     ItemModel,
-    create_item,
+    create_items_bulk,
     delete_item,
     update_category_items,
-    update_item,
+    update_items_bulk,
 )
-from db.session_handler import SessionModel, create_session, get_session_data
-
-load_dotenv()
+from db.schema import ensure_schema
+from db.transactions import warm_up
+from db.session_handler import SessionModel, create_session, get_session_snapshot
+from llm_batcher import ClassifyBatcher
+from llm_cache import MemoryBackend, RedisBackend, TTLCache, make_cache_key
+from llm_classifier import CLASSIFIER_MODEL, BatchClassifier
+from llm_generator import AsyncTaxonomyGenerator
+from llm_rate_limit import RateLimiter
+from request_limits import BodySizeLimitMiddleware
+from server_errors import InternalErrorMiddleware
+from settings import settings
+from write_queue import WriteQueue
+
+logger = logging.getLogger(__name__)
+
+# Server-side OpenAI key. When set, it is used instead of the key sent with
+# /generate_classes and /classify_items requests.
+OPENAI_API_KEY = settings.openai_api_key
+
+# Upper bounds on the lists of one /generate_classes or /classify_items request,
+# so a single request cannot tie up the classifier and the event loop for minutes
+MAX_ITEMS = settings.max_items
+MAX_CATEGORIES = settings.max_categories
 
 
 # Define the request model for generate_classes
 class GenerateClassesRequest(BaseModel):
-    api_key: str = Field(..., description="OpenAI API Key")
-    items: List[Item]  # items in current node
+    # Not needed when the server sets OPENAI_API_KEY
+    api_key: Optional[str] = Field(None, description="OpenAI API Key")
+    items: List[Item] = Field(..., max_length=MAX_ITEMS)  # items in current node
     category: Category  # category of current node
     generation_method: str
     num_categories: Optional[int]
@@ -52,9 +76,13 @@ class GenerateClassesResponse(BaseModel):
 
 # Define the request model for classify_items
 class ClassifyItemsRequest(BaseModel):
-    categories: List[Category]  # subcategories of current node
-    items: List[Item]  # items in current node
-    api_key: str = Field(..., description="OpenAI API Key")
+    # subcategories of current node
+    categories: List[Category] = Field(..., max_length=MAX_CATEGORIES)
+    items: List[Item] = Field(..., max_length=MAX_ITEMS)  # items in current node
+    # Not needed when the server sets OPENAI_API_KEY
+    api_key: Optional[str] = Field(None, description="OpenAI API Key")
+    # "batch" submits to the OpenAI Batch API, see /batch_status
+    mode: Literal["sync", "batch"] = "sync"
 
 
 # Define the response model for classify_items
@@ -62,36 +90,348 @@ class ClassifyItemsResponse(BaseModel):
     classified_items: List[ClassifiedItem]
 
 
+# Define the response model for classify_items in batch mode
+class BatchSubmittedResponse(BaseModel):
+    batch_id: str
+    status: str
+
+
+# Define the response model for batch_status
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str  # OpenAI batch status, e.g. in_progress or completed
+    classified_items: Optional[List[ClassifiedItem]] = None
+    unclassified_items: List[Item] = []
+
+
+# Neo4j driver pool and retry settings
+def _build_neo4j_driver_kwargs() -> dict:
+    return {
+        "max_connection_pool_size": settings.neo4j_max_connection_pool_size,
+        "connection_acquisition_timeout": (
+            settings.neo4j_connection_acquisition_timeout
+        ),
+        # Recycle connections before managed servers (e.g. AuraDB) close them
+        "max_connection_lifetime": settings.neo4j_max_connection_lifetime,
+        # Connections idle for longer are checked before use, so a socket
+        # reset while idle is replaced instead of failing the request
+        "liveness_check_timeout": settings.neo4j_liveness_check_timeout,
+        "keep_alive": settings.neo4j_keep_alive,
+        "max_transaction_retry_time": settings.neo4j_max_transaction_retry_time,
+        "fetch_size": settings.neo4j_fetch_size,
+    }
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    uri = os.getenv("NEO4J_URI")
-    username = os.getenv("NEO4J_USER")
-    password = os.getenv("NEO4J_PASSWORD")
-    if not uri or not username or not password:
-        raise Exception("Missing Neo4j credentials")
-    app.state.neo4j_driver = GraphDatabase.driver(uri, auth=(username, password))
+    driver_kwargs = _build_neo4j_driver_kwargs()
+    app.state.neo4j_driver = AsyncGraphDatabase.driver(
+        settings.neo4j_uri,
+        auth=(settings.neo4j_user, settings.neo4j_password),
+        **driver_kwargs,
+    )
+    await warm_up(
+        app.state.neo4j_driver,
+        min(
+            driver_kwargs["max_connection_pool_size"],
+            settings.neo4j_warmup_connections,
+        ),
+    )
+    await ensure_schema(app.state.neo4j_driver)
+    # One HTTP/2 connection pool shared by every AsyncOpenAI client, so
+    # concurrent LLM calls multiplex over the same few connections
+    # instead of each key opening HTTP/1.1 connections of its own
+    app.state.openai_http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(600, connect=5),
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=100,
+        ),
+    )
+    # Concurrent /classify_items requests with the same key and categories are
+    # merged into one classifier call
+    app.state.classify_batcher = ClassifyBatcher(
+        functools.partial(classify_with_llm, app.state.openai_http),
+        max_wait=settings.classify_batch_window_ms / 1000,
+        max_items=settings.classify_batch_max_items,
+    )
+    # Exact-match cache of LLM results, so repeated requests skip OpenAI
+    app.state.llm_cache = TTLCache(
+        maxsize=settings.llm_cache_size,
+        ttl=settings.llm_cache_ttl_seconds,
+    )
+    # Per-item classifications, so items already classified into the same
+    # categories skip OpenAI even inside otherwise new requests. Shared through
+    # Redis when REDIS_URL is set, in-process otherwise.
+    item_cache_ttl = settings.classification_cache_ttl_seconds
+    if settings.redis_url:
+        app.state.classification_cache = RedisBackend(
+            settings.redis_url, ttl=item_cache_ttl
+        )
+    else:
+        app.state.classification_cache = MemoryBackend(
+            maxsize=settings.classification_cache_size,
+            ttl=item_cache_ttl,
+        )
+    # Large item payloads are parsed and validated in worker processes, so a
+    # big request does not stall every other request on the event loop
+    app.state.validation_pool = ProcessPoolExecutor(
+        max_workers=settings.validation_workers
+    )
+    app.state.validation_offload_bytes = settings.validation_offload_bytes
+    # Item writes sent with ?async=true are acknowledged with 202 and run in
+    # the background, merged per session
+    app.state.write_queue = WriteQueue(
+        build_write_handlers(app.state.neo4j_driver),
+        max_wait=settings.async_write_window_ms / 1000,
+    )
+    app.state.write_queue.start()
     yield
-    app.state.neo4j_driver.close()
+    await app.state.write_queue.close()
+    await app.state.classification_cache.close()
+    _generators.clear()
+    _batch_classifiers.clear()
+    _openai_clients.clear()
+    _rate_limiters.clear()
+    await app.state.openai_http.aclose()
+    app.state.validation_pool.shutdown(wait=False)
+    await app.state.neo4j_driver.close()
+
+
+# Responses are validated against their response_model by pydantic-core and
+# then encoded with orjson instead of the standard library json module
+app = FastAPI(
+    title="Taxonomy Synthesis API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
+# Unhandled errors are answered with a 500 here instead of in each endpoint.
+# Added first, so it is the innermost middleware and, like the body size
+# limit below, runs inside the CORS middleware and its responses carry CORS
+# headers.
+app.add_middleware(InternalErrorMiddleware)
 
-app = FastAPI(title="Taxonomy Synthesis API", lifespan=lifespan)
+# Oversized bodies are rejected with a 413 before they are read
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.max_body_bytes,
+)
 
+# Explicit origins, methods and headers instead of wildcards; preflight
+# responses are cached by browsers for a day. The API uses no cookies.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Update this to your frontend's domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.cors_origin_list,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=[
+        "Authorization",
+        "Content-Type",
+        "If-None-Match",
+        "X-OpenAI-Api-Key",
+    ],
+    expose_headers=["ETag", "Retry-After"],
+    max_age=86400,
 )
 
+# Session trees and item lists are large, repetitive JSON; compress responses
+# above 1 KB for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+# Passes OpenAI's rate limiting on to the client instead of reporting a 500
+async def rate_limit_handler(request: Request, exc: RateLimitError) -> ORJSONResponse:
+    retry_after = exc.response.headers.get("retry-after", "1")
+    return ORJSONResponse(
+        {"detail": str(exc)}, status_code=429, headers={"Retry-After": retry_after}
+    )
+
+
+app.add_exception_handler(RateLimitError, rate_limit_handler)
+
 
 def get_db(request: Request):
     return request.app.state.neo4j_driver
 
 
-# Helper function to initialize OpenAI client
-def get_openai_client(api_key: str):
-    return OpenAI(api_key=api_key)
+# Background item writes of the write queue, by kind. Each receives the merged
+# payloads of consecutive requests to the same session and merge key.
+def build_write_handlers(driver):
+    async def create(session_id: str, container: Optional[str], items: List[Item]):
+        await create_items_bulk(
+            driver=driver,
+            session_id=session_id,
+            items=items,
+            container_map={item.id: container for item in items},
+        )
+
+    async def update(session_id: str, container: Optional[str], items: List[Item]):
+        await update_items_bulk(
+            driver=driver,
+            session_id=session_id,
+            items=items,
+            is_contained_inside=container,
+        )
+
+    async def delete(session_id: str, _, item_ids: List[str]):
+        await delete_item(driver=driver, session_id=session_id, item_ids=item_ids)
+
+    return {"create_items": create, "update_items": update, "delete_items": delete}
+
+
+class WriteAcceptedResponse(BaseModel):
+    request_id: str
+    status: str
+
+
+# Query flag of the item write endpoints; `async` is a keyword, hence the alias
+RunAsync = Query(
+    False,
+    alias="async",
+    description="Accept the write with 202 and run it in the background. "
+    "Poll `/write_status/{request_id}` for the outcome.",
+)
+
+
+# Queues an item write and acknowledges it with 202 Accepted
+def accept_write(request: Request, session_id: str, kind: str, key, payloads):
+    request_id = request.app.state.write_queue.submit(session_id, kind, key, payloads)
+    return ORJSONResponse(
+        {"request_id": request_id, "status": "accepted"}, status_code=202
+    )
+
+
+# OpenAI clients and classifiers of the most recently used API keys. They are
+# keyed by a hash of the key, so the raw keys are not kept as cache keys.
+OPENAI_CLIENT_CACHE_SIZE = 256
+_openai_clients = TTLCache(maxsize=OPENAI_CLIENT_CACHE_SIZE, ttl=float("inf"))
+_batch_classifiers = TTLCache(maxsize=OPENAI_CLIENT_CACHE_SIZE, ttl=float("inf"))
+_generators = TTLCache(maxsize=2 * OPENAI_CLIENT_CACHE_SIZE, ttl=float("inf"))
+_rate_limiters = TTLCache(maxsize=OPENAI_CLIENT_CACHE_SIZE, ttl=float("inf"))
+
+
+# Helper function to initialize OpenAI client. Clients are cached per key and
+# all send their requests over the app's shared HTTP/2 pool
+def get_openai_client(api_key: str, http_client: httpx.AsyncClient) -> AsyncOpenAI:
+    key_hash = make_cache_key("openai_client", api_key)
+    client = _openai_clients.get(key_hash)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        _openai_clients.set(key_hash, client)
+    return client
+
+
+# OpenAI rate limits are per account, so the classifier and generators of a
+# key share one limiter
+def get_rate_limiter(api_key: str) -> RateLimiter:
+    key_hash = make_cache_key("rate_limiter", api_key)
+    rate_limiter = _rate_limiters.get(key_hash)
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(
+            requests_per_minute=settings.openai_rpm,
+            tokens_per_minute=settings.openai_tpm,
+        )
+        _rate_limiters.set(key_hash, rate_limiter)
+    return rate_limiter
+
+
+# The classifier holds no per-request state, so it is shared per key as well.
+def get_batch_classifier(
+    api_key: str, http_client: httpx.AsyncClient
+) -> BatchClassifier:
+    key_hash = make_cache_key("batch_classifier", api_key)
+    classifier = _batch_classifiers.get(key_hash)
+    if classifier is None:
+        classifier = BatchClassifier(
+            client=get_openai_client(api_key, http_client),
+            batch_size=settings.classify_chunk_size,
+            max_concurrency=settings.openai_concurrency,
+            rate_limiter=get_rate_limiter(api_key),
+        )
+        _batch_classifiers.set(key_hash, classifier)
+    return classifier
+
+
+# Generators are shared per key and settings; each call builds its own prompt
+def get_generator(
+    api_key: str,
+    http_client: httpx.AsyncClient,
+    generation_method: str,
+    max_categories: Optional[int],
+) -> AsyncTaxonomyGenerator:
+    key_hash = make_cache_key("generator", [api_key, generation_method, max_categories])
+    generator = _generators.get(key_hash)
+    if generator is None:
+        generator = AsyncTaxonomyGenerator(
+            client=get_openai_client(api_key, http_client),
+            max_categories=max_categories,
+            generation_method=generation_method,
+            rate_limiter=get_rate_limiter(api_key),
+        )
+        _generators.set(key_hash, generator)
+    return generator
+
+
+# Encodes the items of a write endpoint's response. The handlers already return
+# well-formed ItemModels, so FastAPI's response_model validation is skipped
+def items_response(items: List[ItemModel]) -> ORJSONResponse:
+    return ORJSONResponse({"items": [item.model_dump() for item in items]})
+
+
+# Encodes an already validated response model, skipping FastAPI's dump and
+# re-validation of it against the response_model
+def model_response(model: BaseModel) -> ORJSONResponse:
+    return ORJSONResponse(model.model_dump(mode="json"))
+
+
+BodyModel = TypeVar("BodyModel", bound=BaseModel)
+
+
+# Parses and validates a raw JSON body. Runs in the validation pool, so it is a
+# top-level function and returns the errors as JSON instead of raising them
+def validate_body(model: Type[BodyModel], body: bytes):
+    try:
+        return model.model_validate_json(body), None
+    except ValidationError as e:
+        return None, e.json(include_url=False)
+
+
+# Parses the request body into `model`, in the validation pool once the body
+# is larger than VALIDATION_OFFLOAD_BYTES. Errors are raised as the usual 422.
+async def parse_body(request: Request, model: Type[BodyModel]) -> BodyModel:
+    body = await request.body()
+    if len(body) < request.app.state.validation_offload_bytes:
+        parsed, errors = validate_body(model, body)
+    else:
+        loop = asyncio.get_running_loop()
+        parsed, errors = await loop.run_in_executor(
+            request.app.state.validation_pool, validate_body, model, body
+        )
+    if errors is not None:
+        # Locate the errors in the body, like FastAPI's own validation does
+        raise RequestValidationError(
+            [
+                {**error, "loc": ["body", *error["loc"]]}
+                for error in orjson.loads(errors)
+            ],
+            body=body,
+        )
+    return parsed
+
+
+# Documents the body of an endpoint that parses it with parse_body. Nested
+# models are referenced from the schemas the other endpoints register.
+def body_schema(model: Type[BaseModel]) -> dict:
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": schema}},
+            "required": True,
+        }
+    }
 
 
 class GetSessionRequest(BaseModel):
@@ -121,31 +461,51 @@ class SessionResponse(BaseModel):
     orphan_items: List[Item]
 
 
+# Parses the session version out of an If-None-Match header sent back by a
+# client that holds a previous /session response
+def parse_session_etag(if_none_match: Optional[str]) -> Optional[int]:
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            return int(tag)
+    return None
+
+
 @app.get("/session/{session_id}", response_model=SessionResponse)
-def get_session_endpoint(request: Request, session_id: str):
+async def get_session_endpoint(request: Request, session_id: str):
     """
     Endpoint to retrieve all categories and items within a session.
 
     - **session_id**: ID of the session.
 
-    Returns the session data structured for the frontend.
+    Returns the session data structured for the frontend. The response carries
+    an `ETag` with the session version; sending it back in `If-None-Match`
+    returns `304 Not Modified` while the session is unchanged.
     """
-    try:
-        driver = get_db(request)
-        session_data = get_session_data(driver, session_id)
-        return session_data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    driver = get_db(request)
+    version, session_data = await get_session_snapshot(
+        driver,
+        session_id,
+        known_version=parse_session_etag(request.headers.get("if-none-match")),
+    )
+    if version is None:
+        return ORJSONResponse(session_data)
+
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if session_data is None:
+        return Response(status_code=304, headers=headers)
+    # The tree is built in the response's shape, so it is encoded as is
+    # instead of being validated against SessionResponse first
+    return ORJSONResponse(session_data, headers=headers)
 
 
 @app.post("/initialize_session", response_model=SessionModel)
-def initialize_session(request: Request):
-    try:
-        driver = get_db(request)
-        session_model = create_session(driver)
-        return session_model
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def initialize_session(request: Request):
+    driver = get_db(request)
+    session_model = await create_session(driver)
+    return session_model
 
 
 # Define the request model for create_items
@@ -160,8 +520,13 @@ class CreateItemsResponse(BaseModel):
     items: List[ItemModel]  # List of created ItemModel objects
 
 
-@app.post("/create_items", response_model=CreateItemsResponse)
-def create_items_endpoint(request: Request, create_req: CreateItemsRequest):
+@app.post(
+    "/create_items",
+    response_model=CreateItemsResponse,
+    responses={202: {"model": WriteAcceptedResponse}},
+    openapi_extra=body_schema(CreateItemsRequest),
+)
+async def create_items_endpoint(request: Request, run_async: bool = RunAsync):
     """
     Endpoint to create multiple items within a session.
 
@@ -171,24 +536,27 @@ def create_items_endpoint(request: Request, create_req: CreateItemsRequest):
 
     Returns the list of created items with their unique `_id`s.
     """
-    try:
-        driver = get_db(request)
-        created_items: List[ItemModel] = []
-
-        for ts_item in create_req.items:
-            # Create the item and receive the ItemModel with _id
-            item_model = create_item(
-                driver=driver,
-                session_id=create_req.session_id,
-                item=ts_item,
-                is_contained_inside=create_req.is_contained_inside,
-            )
-            created_items.append(item_model)
-
-        return CreateItemsResponse(items=created_items)
+    create_req = await parse_body(request, CreateItemsRequest)
+    if run_async:
+        return accept_write(
+            request,
+            create_req.session_id,
+            "create_items",
+            create_req.is_contained_inside,
+            create_req.items,
+        )
+    driver = get_db(request)
+    # Create all items in batched transactions and receive the ItemModels with _id
+    created_items = await create_items_bulk(
+        driver=driver,
+        session_id=create_req.session_id,
+        items=create_req.items,
+        container_map={
+            ts_item.id: create_req.is_contained_inside for ts_item in create_req.items
+        },
+    )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return items_response(created_items)
 
 
 # Define the request model for update_items
@@ -203,8 +571,13 @@ class UpdateItemsResponse(BaseModel):
     items: List[ItemModel]  # List of updated ItemModel objects
 
 
-@app.post("/update_items", response_model=UpdateItemsResponse)
-def update_items_endpoint(request: Request, update_req: UpdateItemsRequest):
+@app.post(
+    "/update_items",
+    response_model=UpdateItemsResponse,
+    responses={202: {"model": WriteAcceptedResponse}},
+    openapi_extra=body_schema(UpdateItemsRequest),
+)
+async def update_items_endpoint(request: Request, run_async: bool = RunAsync):
     """
     Endpoint to update multiple items within a session.
 
@@ -228,31 +601,25 @@ def update_items_endpoint(request: Request, update_req: UpdateItemsRequest):
     }
     ```
     """
-    try:
-        driver = get_db(request)
-        updated_items = []
-
-        for ts_item in update_req.items:
-            try:
-                # Update the item and receive the updated ItemModel with id_
-                updated_item = update_item(
-                    driver=driver,
-                    session_id=update_req.session_id,
-                    item=ts_item,
-                    is_contained_inside=update_req.is_contained_inside,
-                )
-                updated_items.append(updated_item)
-            except ValueError as ve:
-                print("Item not found: ", ve)
-
-        return UpdateItemsResponse(items=updated_items)
+    update_req = await parse_body(request, UpdateItemsRequest)
+    if run_async:
+        return accept_write(
+            request,
+            update_req.session_id,
+            "update_items",
+            update_req.is_contained_inside,
+            update_req.items,
+        )
+    driver = get_db(request)
+    # Update all items in batched transactions; unknown items are skipped
+    updated_items = await update_items_bulk(
+        driver=driver,
+        session_id=update_req.session_id,
+        items=update_req.items,
+        is_contained_inside=update_req.is_contained_inside,
+    )
 
-    except ValueError as ve:
-        # This is raised if an item to update was not found and couldn't be created
-        raise HTTPException(status_code=404, detail=str(ve))
-    except Exception as e:
-        # General exception catch-all
-        raise HTTPException(status_code=500, detail=str(e))
+    return items_response(updated_items)
 
 
 # Define the request model for delete_items
@@ -266,8 +633,14 @@ class DeleteItemsResponse(BaseModel):
     detail: str
 
 
-@app.post("/delete_items", response_model=DeleteItemsResponse)
-def delete_items_endpoint(request: Request, delete_req: DeleteItemsRequest):
+@app.post(
+    "/delete_items",
+    response_model=DeleteItemsResponse,
+    responses={202: {"model": WriteAcceptedResponse}},
+)
+async def delete_items_endpoint(
+    request: Request, delete_req: DeleteItemsRequest, run_async: bool = RunAsync
+):
     """
     Endpoint to delete multiple items within a session.
 
@@ -276,13 +649,43 @@ def delete_items_endpoint(request: Request, delete_req: DeleteItemsRequest):
 
     Returns a confirmation message upon successful deletion.
     """
-    try:
-        driver = get_db(request)
-        item_ids = [item.id for item in delete_req.items]
-        delete_item(driver=driver, session_id=delete_req.session_id, item_ids=item_ids)
-        return DeleteItemsResponse(detail="Items deleted successfully.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if run_async:
+        return accept_write(
+            request,
+            delete_req.session_id,
+            "delete_items",
+            None,
+            [item.id for item in delete_req.items],
+        )
+    driver = get_db(request)
+    item_ids = [item.id for item in delete_req.items]
+    await delete_item(
+        driver=driver, session_id=delete_req.session_id, item_ids=item_ids
+    )
+    return DeleteItemsResponse(detail="Items deleted successfully.")
+
+
+class WriteStatusResponse(BaseModel):
+    request_id: str
+    status: str  # accepted, done or failed
+    detail: Optional[str] = None
+
+
+@app.get("/write_status/{request_id}", response_model=WriteStatusResponse)
+async def write_status_endpoint(request: Request, request_id: str):
+    """
+    Endpoint to poll the outcome of an item write sent with `?async=true`.
+
+    - **request_id**: ID returned when the write was accepted.
+
+    Returns `accepted` while the write is queued, then `done` or `failed`
+    with the error in `detail`. Statuses are kept per worker process for the
+    most recent writes only.
+    """
+    status = request.app.state.write_queue.status(request_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown write request.")
+    return status
 
 
 # Define the request model for update_category_items
@@ -297,10 +700,12 @@ class UpdateCategoryItemsResponse(BaseModel):
     items: List[ItemModel]  # List of updated or created ItemModel objects
 
 
-@app.post("/update_category_items", response_model=UpdateCategoryItemsResponse)
-def update_category_items_endpoint(
-    request: Request, update_req: UpdateCategoryItemsRequest
-):
+@app.post(
+    "/update_category_items",
+    response_model=UpdateCategoryItemsResponse,
+    openapi_extra=body_schema(UpdateCategoryItemsRequest),
+)
+async def update_category_items_endpoint(request: Request):
     """
     Endpoint to update the items inside a category.
 
@@ -311,20 +716,19 @@ def update_category_items_endpoint(
 
     Returns the list of updated or created items.
     """
+    update_req = await parse_body(request, UpdateCategoryItemsRequest)
     try:
         driver = get_db(request)
-        updated_items = update_category_items(
+        updated_items = await update_category_items(
             driver=driver,
             session_id=update_req.session_id,
             category_id=update_req.category_id,
             items=update_req.items,
         )
-        return UpdateCategoryItemsResponse(items=updated_items)
+        return items_response(updated_items)
     except ValueError as ve:
         # Handle cases where items to update do not exist
         raise HTTPException(status_code=404, detail=str(ve))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # Define the request model for create_category
@@ -337,7 +741,9 @@ class CreateCategoryRequest(BaseModel):
 
 
 @app.post("/create_category", response_model=CategoryModel)
-def create_category_endpoint(request: Request, category_req: CreateCategoryRequest):
+async def create_category_endpoint(
+    request: Request, category_req: CreateCategoryRequest
+):
     """
     Endpoint to create a new category within a session.
 
@@ -349,24 +755,21 @@ def create_category_endpoint(request: Request, category_req: CreateCategoryReque
 
     Returns the created category with its unique ID.
     """
-    try:
-        driver = get_db(request)
-        created_category = create_category(
-            driver=driver,
-            name=category_req.category.name,
-            description=category_req.category.description,
-            position=category_req.position,
-            session_id=category_req.session_id,
-            is_child_of=category_req.is_child_of,
-            is_parent_of=category_req.is_parent_of,
-        )
-        return CategoryModel(
-            id=created_category.id,
-            name=created_category.name,
-            description=created_category.description,
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    driver = get_db(request)
+    created_category = await create_category(
+        driver=driver,
+        name=category_req.category.name,
+        description=category_req.category.description,
+        position=category_req.position,
+        session_id=category_req.session_id,
+        is_child_of=category_req.is_child_of,
+        is_parent_of=category_req.is_parent_of,
+    )
+    return CategoryModel(
+        id=created_category.id,
+        name=created_category.name,
+        description=created_category.description,
+    )
 
 
 # Define the request model for update_category
@@ -387,7 +790,7 @@ class UpdateCategoryResponse(BaseModel):
 
 
 @app.post("/update_category", response_model=UpdateCategoryResponse)
-def update_category_endpoint(request: Request, update_req: UpdateCategoryRequest):
+async def update_category_endpoint(request: Request, update_req: UpdateCategoryRequest):
     """
     Endpoint to update an existing category within a session.
 
@@ -403,7 +806,7 @@ def update_category_endpoint(request: Request, update_req: UpdateCategoryRequest
     try:
         driver = get_db(request)
 
-        updated_category = update_category(
+        updated_category = await update_category(
             driver=driver,
             session_id=update_req.session_id,
             category_id=update_req.category_id,
@@ -423,8 +826,6 @@ def update_category_endpoint(request: Request, update_req: UpdateCategoryRequest
     except ValueError as ve:
         # Raised when the category is not found
         raise HTTPException(status_code=404, detail=str(ve))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
 # Define the request model for delete_category
@@ -439,7 +840,7 @@ class DeleteCategoryResponse(BaseModel):
 
 
 @app.post("/delete_category", response_model=DeleteCategoryResponse)
-def delete_category_endpoint(request: Request, delete_req: DeleteCategoryRequest):
+async def delete_category_endpoint(request: Request, delete_req: DeleteCategoryRequest):
     """
     Endpoint to delete a category within a session.
 
@@ -448,105 +849,324 @@ def delete_category_endpoint(request: Request, delete_req: DeleteCategoryRequest
 
     Returns a confirmation message upon successful deletion.
     """
-    try:
-        driver = get_db(request)
-        delete_category(
-            driver=driver,
-            session_id=delete_req.session_id,
-            category_id=delete_req.category_id,
+    driver = get_db(request)
+    await delete_category(
+        driver=driver,
+        session_id=delete_req.session_id,
+        category_id=delete_req.category_id,
+    )
+    return DeleteCategoryResponse(detail="Category deleted successfully.")
+
+
+@app.post(
+    "/generate_classes",
+    response_model=GenerateClassesResponse,
+    openapi_extra=body_schema(GenerateClassesRequest),
+)
+async def generate_classes(request: Request):
+    generate_req = await parse_body(request, GenerateClassesRequest)
+    api_key = OPENAI_API_KEY or generate_req.api_key
+    if not api_key:
+        raise HTTPException(status_code=400, detail="API key is required.")
+
+    if generate_req.num_categories == 0:
+        generate_req.num_categories = None
+
+    # Serve identical requests from the cache
+    cache_key = make_cache_key(
+        "generate_classes",
+        generate_req.model_dump(mode="json", exclude={"api_key"}),
+    )
+    cached = request.app.state.llm_cache.get(cache_key)
+    if cached is not None:
+        return model_response(GenerateClassesResponse(categories=cached))
+
+    # Taxonomy Generator shared by requests with the same key and settings
+    generator = get_generator(
+        api_key,
+        request.app.state.openai_http,
+        generate_req.generation_method,
+        generate_req.num_categories,
+    )
+
+    # Generate subcategories. This is all NodeOperator.generate_subcategories
+    # does besides attaching them to a throwaway TreeNode, so neither the
+    # operator, a classifier nor a tree is built for it
+    new_categories = await generator.agenerate_categories(
+        generate_req.items, generate_req.category
+    )
+
+    request.app.state.llm_cache.set(cache_key, new_categories)
+    return model_response(GenerateClassesResponse(categories=new_categories))
+
+
+# Classification of items into categories, run by the classify batcher
+async def classify_with_llm(
+    http_client: httpx.AsyncClient,
+    api_key: str,
+    items: List[Item],
+    categories: List[Category],
+    batch_size: Optional[int] = None,
+) -> List[ClassifiedItem]:
+    classifier = get_batch_classifier(api_key, http_client)
+    return await classifier.classify_items(items, categories, batch_size)
+
+
+# Bump when the classification prompt or schema changes, so cached
+# classifications of the previous prompt are not served
+CLASSIFICATION_PROMPT_VERSION = 2
+
+
+# Classifies items through the per-item classification cache; only the items
+# without a cached category are sent to the classify batcher
+def classification_cache_keys(
+    items: List[Item], categories: List[Category]
+) -> List[str]:
+    categories_json = [category.model_dump(mode="json") for category in categories]
+    return [
+        make_cache_key(
+            "classified_item",
+            [
+                CLASSIFIER_MODEL,
+                CLASSIFICATION_PROMPT_VERSION,
+                categories_json,
+                item.model_dump(mode="json"),
+            ],
         )
-        return DeleteCategoryResponse(detail="Category deleted successfully.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        for item in items
+    ]
+
+
+async def classify_with_cache(
+    request: Request,
+    api_key: str,
+    items: List[Item],
+    categories: List[Category],
+    batch_size: Optional[int],
+) -> List[ClassifiedItem]:
+    cache = request.app.state.classification_cache
+    categories_by_name = {category.name: category for category in categories}
+    keys = classification_cache_keys(items, categories)
+    cached_names = await cache.get_many(keys)
+
+    misses = [
+        index
+        for index, name in enumerate(cached_names)
+        if name not in categories_by_name
+    ]
+    if misses:
+        classified_misses = await request.app.state.classify_batcher.classify(
+            api_key, [items[index] for index in misses], categories, batch_size
+        )
+        await cache.set_many(
+            {
+                keys[index]: classified_item.category.name
+                for index, classified_item in zip(misses, classified_misses)
+            }
+        )
+        for index, classified_item in zip(misses, classified_misses):
+            cached_names[index] = classified_item.category.name
+
+    return [
+        ClassifiedItem(item=item, category=categories_by_name[name])
+        for item, name in zip(items, cached_names)
+    ]
 
 
-# Helper function to create a TreeNode from a Category
-def create_tree_node(
-    category: Category,
-    children: Optional[List[Category]] = None,
-    items: Optional[List[Item]] = None,
+@app.post(
+    "/classify_items",
+    response_model=ClassifyItemsResponse,
+    responses={202: {"model": BatchSubmittedResponse}},
+    openapi_extra=body_schema(ClassifyItemsRequest),
+)
+async def classify_items(
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=500,
+        description="Items classified per OpenAI completion. "
+        "Defaults to CLASSIFY_CHUNK_SIZE.",
+    ),
 ):
-    node = TreeNode(value=category)
-    node.items = items or []
-    if children:
-        for child_category in children:
-            child_node = TreeNode(value=child_category)
-            node.add_child(child_node)
-    return node
-
-
-@app.post("/generate_classes", response_model=GenerateClassesResponse)
-def generate_classes(request: GenerateClassesRequest):
-    # env_key = os.getenv("OPENAI_API_KEY")
-    # if env_key is not None:
-    #     request.api_key = env_key
-    if not request.api_key:
+    classify_req = await parse_body(request, ClassifyItemsRequest)
+    api_key = OPENAI_API_KEY or classify_req.api_key
+    if not api_key:
         raise HTTPException(status_code=400, detail="API key is required.")
 
-    try:
-        if request.num_categories == 0:
-            request.num_categories = None
-
-        # Initialize OpenAI client
-        client = get_openai_client(request.api_key)
-
-        classifier = GPTClassifier(client=client)
-
-        # Initialize the Taxonomy Generator
-        generator = TaxonomyGenerator(
-            client=client,
-            max_categories=request.num_categories,
-            generation_method=request.generation_method,
+    if classify_req.mode == "batch":
+        # Submit to the Batch API at half the cost; poll /batch_status
+        classifier = get_batch_classifier(api_key, request.app.state.openai_http)
+        batch_id = await classifier.submit_batch(
+            classify_req.items, classify_req.categories, batch_size
+        )
+        return ORJSONResponse(
+            {"batch_id": batch_id, "status": "submitted"}, status_code=202
         )
 
-        # Initialize the operator without a classifier (not needed here)
-        operator = NodeOperator(generator=generator, classifier=classifier)
+    # Serve identical requests from the cache
+    cache_key = make_cache_key(
+        "classify_items",
+        classify_req.model_dump(mode="json", exclude={"api_key"}),
+    )
+    cached = request.app.state.llm_cache.get(cache_key)
+    if cached is not None:
+        return model_response(ClassifyItemsResponse(classified_items=cached))
 
-        root_node = create_tree_node(request.category, items=request.items)
+    # Classify items, cached per item and batched with concurrent requests
+    classified_items = await classify_with_cache(
+        request, api_key, classify_req.items, classify_req.categories, batch_size
+    )
 
-        # Generate subcategories
-        new_categories = operator.generate_subcategories(root_node)
+    request.app.state.llm_cache.set(cache_key, classified_items)
+    return model_response(ClassifyItemsResponse(classified_items=classified_items))
 
-        return GenerateClassesResponse(categories=new_categories)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
+# Seconds between SSE comments that keep idle proxies from closing the stream
+STREAM_PING_INTERVAL = 15
 
-@app.post("/classify_items", response_model=ClassifyItemsResponse)
-def classify_items(request: ClassifyItemsRequest):
-    # env_key = os.getenv("OPENAI_API_KEY")
-    # if env_key is not None:
-    #     request.api_key = env_key
 
-    if not request.api_key:
-        raise HTTPException(status_code=400, detail="API key is required.")
+def sse_event(data, event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(data) + b"\n\n"
 
+
+async def stream_classifications(
+    request: Request,
+    api_key: str,
+    items: List[Item],
+    categories: List[Category],
+    batch_size: Optional[int],
+):
+    cache = request.app.state.classification_cache
+    categories_by_name = {category.name: category for category in categories}
+    keys = classification_cache_keys(items, categories)
+    keys_by_id = {item.id: key for item, key in zip(items, keys)}
     try:
-        # Initialize OpenAI client
-        client = get_openai_client(request.api_key)
+        # Cached items are sent first, the rest as their chunk completes
+        cached_names = await cache.get_many(keys)
+        misses = []
+        for item, name in zip(items, cached_names):
+            if name in categories_by_name:
+                classified_item = ClassifiedItem(
+                    item=item, category=categories_by_name[name]
+                )
+                yield sse_event(classified_item.model_dump(mode="json"))
+            else:
+                misses.append(item)
+
+        classifier = get_batch_classifier(api_key, request.app.state.openai_http)
+        chunks = classifier.iter_classify_items(misses, categories, batch_size)
+        next_chunk = None
+        try:
+            while True:
+                next_chunk = asyncio.ensure_future(chunks.__anext__())
+                while not next_chunk.done():
+                    await asyncio.wait({next_chunk}, timeout=STREAM_PING_INTERVAL)
+                    if not next_chunk.done():
+                        yield b": ping\n\n"
+                try:
+                    chunk_items = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                next_chunk = None
+                await cache.set_many(
+                    {
+                        keys_by_id[classified_item.item.id]: (
+                            classified_item.category.name
+                        )
+                        for classified_item in chunk_items
+                    }
+                )
+                for classified_item in chunk_items:
+                    yield sse_event(classified_item.model_dump(mode="json"))
+        finally:
+            # A client that disconnects mid-chunk closes the stream while the
+            # classifier is still running. Cancelling it lets the classifier
+            # cancel its pending completions before the generator is closed.
+            if next_chunk is not None and not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.gather(next_chunk, return_exceptions=True)
+            await chunks.aclose()
+    # Closing the stream raises BaseExceptions, so this only sees real failures
+    except Exception as e:
+        logger.exception("Streaming classification failed")
+        yield sse_event({"detail": str(e)}, event="error")
+        return
+    yield sse_event({}, event="done")
 
-        # Initialize the GPT classifier
-        classifier = GPTClassifier(client=client)
 
-        # Initialize the Taxonomy Generator
-        generator = TaxonomyGenerator(
-            client=client,
-            max_categories=2,
-            generation_method="Generate subcategories based on the parent category.",
-        )
+@app.post(
+    "/classify_items_stream",
+    response_class=StreamingResponse,
+    openapi_extra=body_schema(ClassifyItemsRequest),
+)
+async def classify_items_stream(
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=500,
+        description="Items classified per OpenAI completion. "
+        "Defaults to CLASSIFY_CHUNK_SIZE.",
+    ),
+):
+    """
+    Endpoint to classify items, streaming each result as a Server-Sent Event.
+
+    Takes the same body as `/classify_items` (`mode` is ignored). Each
+    classified item is sent as a `data:` event as soon as its chunk is
+    classified, so items arrive in completion order rather than input order.
+    The stream ends with a `done` event, or an `error` event with a `detail`.
+    """
+    classify_req = await parse_body(request, ClassifyItemsRequest)
+    api_key = OPENAI_API_KEY or classify_req.api_key
+    if not api_key:
+        raise HTTPException(status_code=400, detail="API key is required.")
 
-        # Initialize the operator without a generator (not needed here)
-        operator = NodeOperator(generator=generator, classifier=classifier)
+    return StreamingResponse(
+        stream_classifications(
+            request, api_key, classify_req.items, classify_req.categories, batch_size
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Marked as encoded so GZipMiddleware does not buffer the events
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@app.get("/batch_status/{batch_id}", response_model=BatchStatusResponse)
+async def batch_status(
+    request: Request,
+    batch_id: str,
+    api_key: Optional[str] = Header(
+        None,
+        alias="X-OpenAI-Api-Key",
+        description="OpenAI API Key the batch was submitted with",
+    ),
+):
+    """
+    Endpoint to poll a classification submitted with `mode: "batch"`.
 
-        root_node = create_tree_node(
-            Category(name="Root", description="asd"),
-            children=request.categories,
-            items=request.items,
-        )
+    - **batch_id**: ID returned by `/classify_items`.
 
-        # Classify items
-        classified_items = operator.classify_items(root_node, root_node.get_all_items())
+    Returns the OpenAI batch status. Once it is `completed`, the response also
+    carries the classified items and any items the batch failed to classify.
+    """
+    api_key = OPENAI_API_KEY or api_key
+    if not api_key:
+        raise HTTPException(status_code=400, detail="API key is required.")
 
-        return ClassifyItemsResponse(classified_items=classified_items)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    classifier = get_batch_classifier(api_key, request.app.state.openai_http)
+    status, classified_items, unclassified_items = await classifier.batch_result(
+        batch_id
+    )
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status=status,
+        classified_items=classified_items,
+        unclassified_items=unclassified_items,
+    )
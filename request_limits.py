@@ -0,0 +1,56 @@
+# request_limits.py
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects requests whose body exceeds `max_body_size` bytes with a 413, and
+    requests with a malformed Content-Length with a 400.
+
+    Requests that declare a larger Content-Length are rejected before their
+    body is read. Bodies sent without one (chunked) are counted as they are
+    received, and reading one past the limit raises a 413 `HTTPException`, so
+    an oversized body is never buffered in full. A `max_body_size` of 0
+    disables the limit.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_body_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {self.max_body_size} bytes."
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    response = ORJSONResponse(
+                        {"detail": "Invalid Content-Length header."}, status_code=400
+                    )
+                    await response(scope, receive, send)
+                    return
+                if content_length > self.max_body_size:
+                    response = ORJSONResponse({"detail": detail}, status_code=413)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,45 @@
+# server_errors.py
+
+import logging
+
+from fastapi.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class InternalErrorMiddleware:
+    """
+    Answers requests that fail with an unhandled exception with a 500 and the
+    error message as `detail`.
+
+    Starlette's own handler for `Exception` runs outside every middleware, so
+    its responses lack CORS headers, and it re-raises the error, which logs the
+    traceback a second time. Added as the innermost middleware, this answers
+    the error inside the stack instead and logs it once. Errors raised after
+    the response has started cannot be answered and are re-raised.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracked_send)
+        except Exception as exc:
+            if response_started:
+                raise
+            logger.exception("%s %s failed", scope["method"], scope["path"])
+            response = ORJSONResponse({"detail": str(exc)}, status_code=500)
+            await response(scope, receive, send)
@@ -0,0 +1,66 @@
+# settings.py
+
+from typing import List, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    Configuration of the app, read once from the environment and `.env`.
+
+    Each field is set by the upper-cased environment variable of its name (e.g.
+    `NEO4J_URI`), see the Configuration section of the README. Missing Neo4j
+    credentials or malformed values fail on import instead of on first use.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Neo4j
+    neo4j_uri: str
+    neo4j_user: str
+    neo4j_password: str
+    neo4j_max_connection_pool_size: int = 200
+    neo4j_connection_acquisition_timeout: float = 60
+    neo4j_max_connection_lifetime: float = 3000
+    neo4j_liveness_check_timeout: float = 60
+    neo4j_keep_alive: bool = True
+    neo4j_max_transaction_retry_time: float = 15
+    neo4j_fetch_size: int = 1000
+    neo4j_warmup_connections: int = 20
+
+    # OpenAI
+    openai_api_key: Optional[str] = None
+    openai_max_connections: int = 200
+    openai_concurrency: int = 32
+    openai_rpm: float = 3500
+    openai_tpm: float = 2000000
+    classify_chunk_size: int = 50
+    classify_batch_window_ms: float = 75
+    classify_batch_max_items: int = 200
+
+    # Caches
+    llm_cache_size: int = 1024
+    llm_cache_ttl_seconds: float = 3600
+    classification_cache_size: int = 100000
+    classification_cache_ttl_seconds: float = 86400
+    redis_url: Optional[str] = None
+
+    # Requests
+    max_body_bytes: int = 10 * 1024 * 1024
+    max_items: int = 2000
+    max_categories: int = 200
+    validation_workers: int = 4
+    validation_offload_bytes: int = 1000000
+    async_write_window_ms: float = 50
+    # Comma-separated list of allowed origins
+    cors_origins: str = "*"
+
+    @property
+    def cors_origin_list(self) -> List[str]:
+        return [
+            origin.strip() for origin in self.cors_origins.split(",") if origin.strip()
+        ]
+
+
+settings = Settings()
@@ -0,0 +1,143 @@
+# write_queue.py
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Write call: (session_id, merge_key, payloads) -> None
+WriteFunc = Callable[[str, Any, List[Any]], Awaitable[None]]
+
+
+class _Write:
+    def __init__(self, request_id: str, session_id: str, kind: str, key, payloads):
+        self.request_id = request_id
+        self.session_id = session_id
+        self.kind = kind
+        self.key = key
+        self.payloads = payloads
+
+
+class WriteQueue:
+    """
+    Runs accepted writes in the background and keeps their status for polling.
+
+    Writes are collected for `max_wait` seconds and grouped by session. The
+    writes of a session run in the order they were submitted, and consecutive
+    writes of the same kind and merge key (e.g. item creations into the same
+    category) are merged into a single call of the kind's handler. Different
+    sessions are written concurrently.
+
+    The status of the last `max_statuses` writes is kept in memory, so it is
+    only visible on the worker process that accepted the write.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, WriteFunc],
+        max_wait: float = 0.05,
+        max_statuses: int = 10000,
+    ):
+        self.handlers = handlers
+        self.max_wait = max_wait
+        self.max_statuses = max_statuses
+        self._queue: "asyncio.Queue[Optional[_Write]]" = asyncio.Queue()
+        self._statuses: "OrderedDict[str, dict]" = OrderedDict()
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._worker = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """
+        Runs the writes that are still queued and stops the worker.
+        """
+        if self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    def submit(self, session_id: str, kind: str, key, payloads: List[Any]) -> str:
+        """
+        Queues a write and returns the request id to poll its status with.
+
+        Args:
+            session_id (str): ID of the session written to.
+            kind (str): Name of the handler that performs the write.
+            key: Writes of the same kind are only merged if their keys are equal.
+            payloads (List[Any]): The items or ids to write.
+
+        Returns:
+            str: The request id of the write.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown write kind '{kind}'")
+        request_id = uuid.uuid4().hex
+        self._set_status(request_id, "accepted")
+        self._queue.put_nowait(_Write(request_id, session_id, kind, key, payloads))
+        return request_id
+
+    def status(self, request_id: str) -> Optional[dict]:
+        return self._statuses.get(request_id)
+
+    def _set_status(
+        self, request_id: str, status: str, detail: Optional[str] = None
+    ) -> None:
+        entry = {"request_id": request_id, "status": status}
+        if detail is not None:
+            entry["detail"] = detail
+        self._statuses[request_id] = entry
+        self._statuses.move_to_end(request_id)
+        while len(self._statuses) > self.max_statuses:
+            self._statuses.popitem(last=False)
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            write = await self._queue.get()
+            batch: List[_Write] = []
+            if write is None:
+                closing = True
+            else:
+                batch.append(write)
+                # Let concurrent writes arrive before running the batch
+                await asyncio.sleep(self.max_wait)
+            while not self._queue.empty():
+                write = self._queue.get_nowait()
+                if write is None:
+                    closing = True
+                else:
+                    batch.append(write)
+
+            sessions: Dict[str, List[_Write]] = {}
+            for write in batch:
+                sessions.setdefault(write.session_id, []).append(write)
+            await asyncio.gather(
+                *(self._run_session(writes) for writes in sessions.values())
+            )
+
+    async def _run_session(self, writes: List[_Write]) -> None:
+        # Split the session's writes into runs that can be merged
+        runs: List[Tuple[Tuple[str, Any], List[_Write]]] = []
+        for write in writes:
+            merge_key = (write.kind, write.key)
+            if runs and runs[-1][0] == merge_key:
+                runs[-1][1].append(write)
+            else:
+                runs.append((merge_key, [write]))
+
+        for (kind, key), run in runs:
+            payloads = [payload for write in run for payload in write.payloads]
+            try:
+                await self.handlers[kind](run[0].session_id, key, payloads)
+            except Exception as e:
+                logger.exception("Background %s write failed", kind)
+                for write in run:
+                    self._set_status(write.request_id, "failed", str(e))
+            else:
+                for write in run:
+                    self._set_status(write.request_id, "done")